@@ -0,0 +1,269 @@
+"""
+Fingerprinted, pre-compressed static assets.
+
+Every file under static/ is copied to static/dist/ with a content hash in its
+name, e.g. js/htmx-2.0.4.js -> dist/js/htmx-2.0.4.3f2a9c1b7e4d.js. JavaScript
+and CSS are minified (if rjsmin/rcssmin are installed) and written next to
+gzip and, if the brotli package is installed, brotli compressed copies.
+Templates reference assets through asset_url(), and PrecompressedStaticFiles
+serves the compressed copy the browser accepts with a long-lived, immutable
+Cache-Control header. Copies of files which are neither in the current nor in
+the previous build are removed.
+
+Usage:
+    python assets.py        # build static/dist ahead of time
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable
+
+from log2d import Log
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+log = Log(Path(__file__).stem).logger
+LOG_LEVEL = "INFO"
+log.setLevel(level=f"{LOG_LEVEL}")
+
+DIST = "dist"
+MANIFEST = "manifest.json"
+COMPRESSIBLE = {".js", ".css", ".svg", ".html", ".json", ".txt"}
+# Content codings of the pre-compressed copies, in order of preference.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _file_mode() -> int:
+    # The umask can only be read by setting it, do so once on import.
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o644 & ~umask
+
+
+# mkstemp creates files readable by their owner only, built files are for everyone.
+FILE_MODE = _file_mode()
+
+
+def minify(suffix: str, data: bytes) -> bytes:
+    """
+    Minifies JavaScript and CSS, returns data unchanged if no minifier is installed.
+    """
+    if suffix == ".js" and rjsmin is not None:
+        return rjsmin.jsmin(data.decode("utf-8")).encode("utf-8")
+    if suffix == ".css" and rcssmin is not None:
+        return rcssmin.cssmin(data.decode("utf-8")).encode("utf-8")
+    return data
+
+
+def _write_atomic(path: Path, data: bytes):
+    # Several workers may build at the same time, never expose a partial file.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "wb") as file:
+        file.write(data)
+    os.chmod(temp_path, FILE_MODE)
+    os.replace(temp_path, path)
+
+
+def _read_manifest(dist_dir: Path) -> Dict[str, str]:
+    try:
+        return json.loads((dist_dir / MANIFEST).read_text("utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def prune_assets(dist_dir: Path, *manifests: Dict[str, str]) -> int:
+    """
+    Removes the built copies which are in none of the manifests, with their
+    compressed copies.
+
+    Files being written by another worker (hidden temporary files) are left alone.
+
+    Returns:
+        int: The number of removed files.
+    """
+    keep = {
+        Path(target).relative_to(DIST).as_posix()
+        for manifest in manifests
+        for target in manifest.values()
+    }
+    removed = 0
+    for path in dist_dir.rglob("*"):
+        if not path.is_file() or path.name == MANIFEST or path.name.startswith("."):
+            continue
+        relative = path.relative_to(dist_dir).as_posix()
+        for _, suffix in ENCODINGS:
+            if relative.endswith(suffix) and relative[: -len(suffix)] in keep:
+                relative = relative[: -len(suffix)]
+        if relative not in keep:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def build_assets(static_dir: str) -> Dict[str, str]:
+    """
+    Builds fingerprinted and compressed copies of all static files.
+
+    Files which were already built with the same content are left alone. The
+    copies of the previous build are kept, pages rendered before a restart may
+    still reference them, older copies are removed.
+
+    Args:
+        static_dir (str): The directory mounted at /static.
+
+    Returns:
+        Dict[str, str]: The manifest, mapping e.g. "js/htmx-2.0.4.js" to
+            "dist/js/htmx-2.0.4.3f2a9c1b7e4d.js".
+    """
+    static_dir = Path(static_dir)
+    dist_dir = static_dir / DIST
+    previous = _read_manifest(dist_dir)
+    manifest = {}
+    for source in sorted(static_dir.rglob("*")):
+        relative = source.relative_to(static_dir)
+        if not source.is_file() or relative.parts[0] == DIST:
+            continue
+        data = minify(source.suffix, source.read_bytes())
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        target = relative.with_name(f"{relative.stem}.{digest}{relative.suffix}")
+        manifest[relative.as_posix()] = f"{DIST}/{target.as_posix()}"
+        target = dist_dir / target
+        if target.exists():
+            continue
+        _write_atomic(target, data)
+        if source.suffix in COMPRESSIBLE:
+            _write_atomic(
+                target.with_name(f"{target.name}.gz"),
+                gzip.compress(data, compresslevel=9, mtime=0),
+            )
+            if brotli is not None:
+                _write_atomic(
+                    target.with_name(f"{target.name}.br"),
+                    brotli.compress(data, quality=11),
+                )
+        log.info(f"Built {target}")
+    _write_atomic(dist_dir / MANIFEST, json.dumps(manifest, indent=2).encode("utf-8"))
+    removed = prune_assets(dist_dir, manifest, previous)
+    if removed:
+        log.info(f"Removed {removed} outdated files from {dist_dir}")
+    return manifest
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Parses an Accept-Encoding header into {content coding: quality}.
+
+    Usage:
+        parse_accept_encoding("gzip, br;q=0")  # {"gzip": 1.0, "br": 0.0}
+    """
+    qualities = {}
+    for item in header.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def preferred_encodings(header: str) -> Iterable[tuple]:
+    """
+    Returns the (content coding, suffix) of ENCODINGS which the header accepts,
+    the most preferred first. Codings not listed take the quality of "*".
+    """
+    qualities = parse_accept_encoding(header)
+    default = qualities.get("*", 0.0)
+    accepted = [
+        (qualities.get(encoding, default), -index, encoding, suffix)
+        for index, (encoding, suffix) in enumerate(ENCODINGS)
+    ]
+    return [
+        (encoding, suffix)
+        for quality, _, encoding, suffix in sorted(accepted, reverse=True)
+        if quality > 0
+    ]
+
+
+class AssetManifest:
+    """
+    Resolves static file paths to their fingerprinted copies for templates.
+
+    Usage:
+        templates.env.globals["asset_url"] = AssetManifest(manifest)
+        <script src="{{ asset_url('js/htmx-2.0.4.js') }}"></script>
+    """
+
+    def __init__(self, manifest: Dict[str, str] = None, prefix: str = "/static"):
+        self.manifest = manifest if manifest else {}
+        self.prefix = prefix
+
+    def __call__(self, path: str) -> str:
+        return f"{self.prefix}/{self.manifest.get(path, path)}"
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles which serves the .br or .gz copy of a fingerprinted asset when
+    the client accepts it, and marks fingerprinted assets as immutable.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if not path.startswith(f"{DIST}/"):
+            return await super().get_response(path, scope)
+        accepted = Headers(scope=scope).get("accept-encoding", "")
+        for encoding, suffix in preferred_encodings(accepted):
+            full_path, stat_result = self.lookup_path(f"{path}{suffix}")
+            if stat_result is None:
+                continue
+            response = FileResponse(
+                full_path,
+                stat_result=stat_result,
+                media_type=mimetypes.guess_type(path)[0],
+                headers={"Content-Encoding": encoding},
+            )
+            break
+        else:
+            response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = IMMUTABLE
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+if __name__ == "__main__":
+    static = sys.argv[1] if len(sys.argv) > 1 else "static"
+    for source, target in build_assets(static).items():
+        print(f"{source} -> {target}")
@@ -7,8 +7,13 @@ import os
 # third-party imports
 import uvicorn
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import (
+    HTMLResponse,
+    FileResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.templating import Jinja2Templates
 from ollama import Client, AsyncClient, ResponseError, ProgressResponse
 from log2d import Log
@@ -27,10 +32,24 @@ from wollama.wollama import (
     mock_job_stack,
     mock_do_work,
     mock_initiate_work,
+    wollama_cache_dir,
 )
+from wollama.bundle import import_bundle
+from wollama.enrich import DetailsCache
+from wollama.fleet import FleetDistributor
+from wollama.monitor import NodeMonitor
+from wollama.resilience import CircuitBreaker, RetryPolicy
+from wollama.store import SharedStore
+from assets import AssetManifest, PrecompressedStaticFiles, build_assets
+from wollama import profiling
+from wollama.logqueue import disable_queued_logging, enable_queued_logging
+from wollama.profiling import span
 
 import asyncio
+import time
 import uuid
+import zlib
+from contextlib import AsyncExitStack, asynccontextmanager
 
 context = {"jobs": {}}
 
@@ -56,8 +75,38 @@ except Exception as e:
     )
     log.warning(e)
 
+# Queued logging
+# Default: TRUE
+# True: Log records are written by a background thread, logging never blocks the event loop.
+QUEUED_LOGGING = os.getenv("QUEUED_LOGGING", "TRUE").upper() == "TRUE"
+if QUEUED_LOGGING:
+    enable_queued_logging()
+
 OLLAMA_ADDRESS = os.getenv("OLLAMA_ADDRESS")
 
+# Remote registry
+# Defaults to ollama.com, can point at a local stand-in for load testing.
+registry_options = {}
+if os.getenv("OLLAMA_REGISTRY_URL"):
+    registry_options["url"] = os.getenv("OLLAMA_REGISTRY_URL")
+if os.getenv("OLLAMA_REGISTRY_DELAY"):
+    registry_options["delay"] = float(os.getenv("OLLAMA_REGISTRY_DELAY"))
+if os.getenv("WOLLAMA_CACHE_DIR"):
+    registry_options["cache_dir"] = os.getenv("WOLLAMA_CACHE_DIR")
+# Tail latency controls of registry refreshes
+if os.getenv("REGISTRY_TIMEOUT"):
+    registry_options["timeout"] = float(os.getenv("REGISTRY_TIMEOUT"))
+if os.getenv("REGISTRY_REFRESH_DEADLINE"):
+    registry_options["refresh_deadline"] = float(os.getenv("REGISTRY_REFRESH_DEADLINE"))
+if os.getenv("REGISTRY_RETRIES"):
+    registry_options["retry"] = RetryPolicy(attempts=int(os.getenv("REGISTRY_RETRIES")) + 1)
+if os.getenv("REGISTRY_HEDGE_AFTER"):
+    registry_options["hedge_after"] = float(os.getenv("REGISTRY_HEDGE_AFTER"))
+if os.getenv("REGISTRY_BREAKER_THRESHOLD"):
+    registry_options["breaker"] = CircuitBreaker(
+        failure_threshold=int(os.getenv("REGISTRY_BREAKER_THRESHOLD"))
+    )
+
 MOCK_REMOTE_TRAFFIC = os.getenv("MOCK_REMOTE_TRAFFIC")
 
 if MOCK_REMOTE_TRAFFIC is not None:
@@ -69,7 +118,112 @@ if MOCK_REMOTE_TRAFFIC is not None:
         MOCK_REMOTE_TRAFFIC = False
 else:
     MOCK_REMOTE_TRAFFIC = False
+# Lazy tags
+# Default: FALSE
+# True: Refreshing the catalog fetches only the library index. The tags of a model are
+# fetched when its row is viewed and cached for LAZY_TAGS_TTL seconds.
+LAZY_TAGS = os.getenv("LAZY_TAGS", "FALSE").upper() == "TRUE"
+registry_options["lazy"] = LAZY_TAGS
+if os.getenv("LAZY_TAGS_TTL"):
+    registry_options["tag_ttl"] = float(os.getenv("LAZY_TAGS_TTL"))
+
+# Parse workers
+# Default: inline
+# Where a refresh parses the library pages: "inline" on the event loop, "thread" or
+# "process" in a pool of PARSE_POOL_SIZE workers (default 2), so that parsing does not
+# hold up other requests. The loop lag during a refresh is logged when it finishes.
+registry_options["parse_workers"] = os.getenv("PARSE_WORKERS", "inline").lower()
+if os.getenv("PARSE_POOL_SIZE"):
+    registry_options["parse_pool_size"] = int(os.getenv("PARSE_POOL_SIZE"))
+
+# Profiling
+# PROFILING=TRUE records timing spans and a sampled profile for every request.
+# Otherwise, trusted clients can profile a single request by sending the
+# "X-Wollama-Profile: 1" header.
+PROFILING = os.getenv("PROFILING", "FALSE").upper() == "TRUE"
+PROFILE_TRUSTED_CLIENTS = [
+    host.strip()
+    for host in os.getenv("PROFILE_TRUSTED_CLIENTS", "127.0.0.1,::1").split(",")
+    if host.strip()
+]
+profiling.enabled = PROFILING
+try:
+    profiling.sample_interval = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+except ValueError as e:
+    log.warning(f"Invalid PROFILE_SAMPLE_INTERVAL, using default: {e}")
+if PROFILING:
+    log.warning("Profiling every request!")
+
+# Shared state
+# Running more than one worker (WORKERS > 1) requires SHARED_STATE_PATH, the path of a
+# SQLite database through which the workers share jobs and catalogs.
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH")
+WORKERS = int(os.getenv("WORKERS", "1"))
+store = SharedStore(SHARED_STATE_PATH) if SHARED_STATE_PATH else None
+if store is not None:
+    registry_options["store"] = store
+elif WORKERS > 1:
+    log.warning(
+        "Running several workers without SHARED_STATE_PATH, status polls will fail!"
+    )
+# Streaming library page
+# Default: FALSE
+# True: The library page is rendered in chunks, the header is sent before the catalog is rendered.
+# The first byte arrives sooner, but the whole page takes longer, see benchmarks/loadtest.py.
+STREAM_LIBRARY = os.getenv("STREAM_LIBRARY", "FALSE").upper() == "TRUE"
+STREAM_CHUNK_SIZE = 8 * 1024
+
+# Static assets
+# Default: TRUE
+# True: Static files are served from fingerprinted, pre-compressed copies in static/dist
+# which browsers cache for a year. Build them ahead of time with `python assets.py`.
+ASSET_PIPELINE = os.getenv("ASSET_PIPELINE", "TRUE").upper() == "TRUE"
+
+# Fleet distribution
+# FLEET_NODES: Comma separated addresses of other Ollama nodes, e.g. http://gpu-2:11434.
+# Models are pulled once onto OLLAMA_ADDRESS (the seed) and copied to the fleet from
+# OLLAMA_MODELS_DIR, the seed's models directory, which must be readable by this app.
+FLEET_NODES = [
+    node.strip() for node in os.getenv("FLEET_NODES", "").split(",") if node.strip()
+]
+OLLAMA_MODELS_DIR = os.getenv("OLLAMA_MODELS_DIR", str(Path.home() / ".ollama" / "models"))
+fleet = FleetDistributor(OLLAMA_MODELS_DIR, FLEET_NODES) if FLEET_NODES else None
+
+# Model details
+# Default: TRUE
+# True: `ollama show` is queried for every installed tag (at most MODEL_DETAILS_CONCURRENCY
+# at a time) and the results are cached by digest in the cache directory.
+MODEL_DETAILS = os.getenv("MODEL_DETAILS", "TRUE").upper() == "TRUE"
+MODEL_DETAILS_CONCURRENCY = int(os.getenv("MODEL_DETAILS_CONCURRENCY", "4"))
+details_cache = (
+    DetailsCache(
+        os.path.join(
+            registry_options.get("cache_dir", wollama_cache_dir), "model-details.json"
+        )
+    )
+    if MODEL_DETAILS
+    else None
+)
 
+# Catalog bundle
+# Default: unset
+# A bundle written by `python -m wollama.bundle export`, imported on startup unless the
+# shared state already holds a catalog. CATALOG_BUNDLE_MODE "merge" (default) adds the
+# bundle's models to the cached catalog and takes its tags where they are newer,
+# "replace" adopts the bundle's catalog as it is, e.g. on air-gapped nodes.
+CATALOG_BUNDLE = os.getenv("CATALOG_BUNDLE")
+CATALOG_BUNDLE_MODE = os.getenv("CATALOG_BUNDLE_MODE", "merge").lower()
+
+# Node monitor
+# Default: TRUE
+# True: OLLAMA_ADDRESS and the FLEET_NODES are probed every NODE_MONITOR_INTERVAL seconds
+# in the background. The header shows their status, latency and loaded models, with
+# sparklines of the last NODE_MONITOR_HISTORY probes. A node answering slower than
+# NODE_MONITOR_SLOW_MS milliseconds is shown as slow.
+NODE_MONITOR = os.getenv("NODE_MONITOR", "TRUE").upper() == "TRUE"
+NODE_MONITOR_INTERVAL = float(os.getenv("NODE_MONITOR_INTERVAL", "10"))
+NODE_MONITOR_HISTORY = int(os.getenv("NODE_MONITOR_HISTORY", "60"))
+NODE_MONITOR_SLOW_MS = float(os.getenv("NODE_MONITOR_SLOW_MS", "1000"))
 
 # Initialize the ollama client
 try:
@@ -80,16 +234,50 @@ except Exception as e:
     log.error(f"{e}")
 
 # Initialize the OllamaManager to handle downloading and deleting models...
+omanager = None
 try:
-    omanager = OllamaManager(client=oclient, aclient=aclient)
+    omanager = OllamaManager(
+        client=oclient,
+        aclient=aclient,
+        store=store,
+        fleet=fleet,
+        details_cache=details_cache,
+        details_concurrency=MODEL_DETAILS_CONCURRENCY,
+    )
 except Exception as e:
     log.error("Could not instantiate Ollama Manager.")
     log.error(f"{e}")
 
+monitors = (
+    [
+        NodeMonitor(
+            address,
+            interval=NODE_MONITOR_INTERVAL,
+            history=NODE_MONITOR_HISTORY,
+            slow_ms=NODE_MONITOR_SLOW_MS,
+        )
+        for address in [OLLAMA_ADDRESS or "http://localhost:11434", *FLEET_NODES]
+    ]
+    if NODE_MONITOR
+    else []
+)
+
 # Initialize the OllamaRegistry client to read the remote ollama library.
-oregistry = OllamaRegistry()
+oregistry = OllamaRegistry(**registry_options)
 
-if oregistry:
+if oregistry.sync_catalog():
+    log.info("Loaded the remote catalog from the shared state.")
+elif CATALOG_BUNDLE:
+    try:
+        oregistry.load_from_cache()
+    except Exception as e:
+        log.info(f"No cached catalog to merge the bundle into: {e}")
+    try:
+        import_bundle(oregistry, CATALOG_BUNDLE, mode=CATALOG_BUNDLE_MODE)
+        oregistry.save_to_cache()
+    except Exception as e:
+        log.error(f"Could not import the catalog bundle {CATALOG_BUNDLE}: {e}")
+elif oregistry:
     try:
         oregistry.load_from_cache()
     except Exception as e:
@@ -100,20 +288,198 @@ if oregistry:
             print("Could not refresh the remote catalog from the web!")
 
 
+class ProfiledJinja2Templates(Jinja2Templates):
+    """
+    Jinja2Templates which times the rendering of every template response.
+    """
+
+    def TemplateResponse(self, *args, **kwargs):
+        with span(f"render:{kwargs.get('name', '')}"):
+            return super().TemplateResponse(*args, **kwargs)
+
+
 # Initialize jinja2 html templates
-templates = Jinja2Templates(directory="templates")
+templates = ProfiledJinja2Templates(directory="templates")
+
+asset_manifest = {}
+if ASSET_PIPELINE:
+    try:
+        asset_manifest = build_assets("static")
+    except Exception as e:
+        log.error(f"Could not build static assets, serving them as they are: {e}")
+templates.env.globals["asset_url"] = AssetManifest(asset_manifest)
+templates.env.globals["node_monitor_interval"] = NODE_MONITOR_INTERVAL if monitors else None
+# Shares the loader and globals of templates, renders as an async generator.
+async_templates = templates.env.overlay(enable_async=True)
+
+
+async def stream_template(name: str, context: dict, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Renders a template into chunks of about chunk_size characters.
+
+    Yields to the event loop between chunks, so a large render does not hold up
+    other requests, e.g. status polls.
+    """
+    template = async_templates.get_template(name)
+    with span(f"render:{name}", streamed=True):
+        buffer = []
+        size = 0
+        async for piece in template.generate_async(**context):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield "".join(buffer)
+                buffer, size = [], 0
+                await asyncio.sleep(0)
+        if buffer:
+            yield "".join(buffer)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if QUEUED_LOGGING:
+        # Queue the loggers of modules imported since startup, e.g. by the app server.
+        enable_queued_logging()
+    profiling.loop_lag.start()
+    # Fetch the details of installed models in the background, the page works without them.
+    enrich_task = (
+        asyncio.create_task(omanager.aenrich()) if omanager is not None else None
+    )
+    # Probe the nodes in the background, pages only read the samples.
+    monitor_tasks = [asyncio.create_task(monitor.run()) for monitor in monitors]
+    yield
+    if enrich_task is not None:
+        enrich_task.cancel()
+    for task in monitor_tasks:
+        task.cancel()
+    oregistry.close()
+    profiling.loop_lag.stop()
+    disable_queued_logging()
+
 
 # Initialize the fastapi application server
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
+# Compresses HTML responses, pre-compressed assets are passed through as they are.
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+def is_trusted_client(request: Request) -> bool:
+    return request.client is not None and request.client.host in PROFILE_TRUSTED_CLIENTS
+
+
+def ollama_manager() -> OllamaManager:
+    """
+    Returns the OllamaManager, for routes which need Ollama.
+
+    Raises:
+        HTTPException: 503 if Ollama could not be reached on startup.
+    """
+    if omanager is None:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Ollama at '{OLLAMA_ADDRESS}' was unreachable on startup, "
+            "restart ollama-admin-ui once it is up.",
+        )
+    return omanager
+
+
+@app.middleware("http")
+async def sync_shared_state(request: Request, call_next):
+    """
+    Adopts catalogs which other workers changed since the last request.
+    """
+    if store is not None and not request.url.path.startswith("/static"):
+        if omanager is not None:
+            omanager.sync_catalog()
+        oregistry.sync_catalog()
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    path = request.url.path
+    if path.startswith(("/static", "/admin")):
+        return await call_next(request)
+    if not PROFILING and not (
+        request.headers.get("X-Wollama-Profile") == "1" and is_trusted_client(request)
+    ):
+        return await call_next(request)
+    async with AsyncExitStack() as stack:
+        profile = await stack.enter_async_context(
+            profiling.profile_request(f"{request.method} {path}")
+        )
+        response = await call_next(request)
+        # call_next returns once the headers are ready, the body, e.g. a streamed
+        # template, is produced while it is sent: profile until it is exhausted.
+        finish = stack.pop_all()
+    response.headers["X-Wollama-Profile"] = profile.identifier
+    response.body_iterator = profiled_body(response.body_iterator, finish)
+    return response
+
+
+async def profiled_body(body, finish: AsyncExitStack):
+    """
+    Yields the chunks of a response body, then closes the profile in finish.
+    """
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        await finish.aclose()
+
+
+@app.get("/admin/profiles")
+async def get_profiles(request: Request):
+    if not is_trusted_client(request):
+        raise HTTPException(status_code=403)
+    return {
+        "profiles": [
+            {
+                "identifier": profile.identifier,
+                "label": profile.label,
+                "started": profile.started,
+                "duration_ms": profile.duration_ms,
+                "samples": profile.samples,
+                "spans": profile.spans,
+                "top_functions": profile.top_functions(),
+            }
+            for profile in reversed(profiling.recent_profiles)
+        ],
+        "recent_spans": list(reversed(profiling.recent_spans)),
+    }
+
+
+@app.get("/admin/loop-lag")
+async def get_loop_lag(request: Request, seconds: float = 60):
+    """
+    Returns event loop lag percentiles over the last seconds.
+    """
+    if not is_trusted_client(request):
+        raise HTTPException(status_code=403)
+    return profiling.loop_lag.summary(since=time.time() - seconds)
+
+
+@app.get("/admin/profiles/{identifier}", response_class=PlainTextResponse)
+async def get_profile(request: Request, identifier: str):
+    """
+    Returns the folded stacks of a profile, e.g. for speedscope or flamegraph.pl.
+    """
+    if not is_trusted_client(request):
+        raise HTTPException(status_code=403)
+    profile = profiling.get_profile(identifier)
+    if profile is None:
+        raise HTTPException(status_code=404)
+    return profile.folded()
 
 
 @app.put("/draft/download/{model_name}")
 async def put_async_download(request: Request, model_name: str, tag: str):
+    manager = ollama_manager()
     finish_code = f"{model_name}:{tag}"
-    if model_name in omanager.catalog.models.keys():
-        if tag in omanager.catalog.models[f"{model_name}"].tag_collection.tags.keys():
+    if model_name in manager.catalog.models.keys():
+        if tag in manager.catalog.models[f"{model_name}"].tag_collection.tags.keys():
             return templates.TemplateResponse(
                 request=request,
                 name="button-downloaded.html",
@@ -128,7 +494,7 @@ async def put_async_download(request: Request, model_name: str, tag: str):
             job_stack=mock_job_stack, finish_code=finish_code
         )
     else:
-        identifier = await omanager.download_wrap(model=model_name, tag=tag)
+        identifier = await manager.download_wrap(model=model_name, tag=tag)
     # return {"identifier": identifier}
     return templates.TemplateResponse(
         request=request,
@@ -144,6 +510,22 @@ async def put_async_download(request: Request, model_name: str, tag: str):
     )
 
 
+@app.put("/draft/distribute/{model_name}")
+async def put_async_distribute(request: Request, model_name: str, tag: str):
+    if fleet is None:
+        raise HTTPException(status_code=404, detail="No fleet nodes are configured")
+    identifier = await ollama_manager().distribute_wrap(model=model_name, tag=tag)
+    return templates.TemplateResponse(
+        request=request,
+        name="start-distribution.html",
+        context={
+            "identifier": f"{identifier}",
+            "message": f"Copying {model_name}:{tag} to {len(FLEET_NODES)} nodes",
+            "job_type": "distribute-model",
+        },
+    )
+
+
 # TODO: Parametize the finish code
 @app.post("/refresh-library")
 async def post_refresh(request: Request):
@@ -179,9 +561,10 @@ async def read_finished(request: Request, job_type: str):
 
 @app.post("/delete/{model_name}")
 def post_delete(request: Request, model_name: str, tag: str):
+    manager = ollama_manager()
     try:
         log.info(f"Deleting {model_name}:{tag}")
-        omanager.delete(model=model_name, tag=tag)
+        manager.delete(model=model_name, tag=tag)
         log.info(f"Finished deleting {model_name}:{tag}")
     except Exception as e:
         print(e)
@@ -214,10 +597,136 @@ async def read_root(request: Request):
             FATAL ERROR: Most likely the server cannot talk to Ollama at:'{OLLAMA_ADDRESS}'             |            Error exception: {e}"
             """
         )
+    context = {
+        "remote": remote,
+        "local": local,
+        "ollama_address": OLLAMA_ADDRESS,
+        "lazy_tags": LAZY_TAGS,
+        "tags_fresh": oregistry.tags_fresh,
+        "fleet_nodes": FLEET_NODES,
+    }
+    if STREAM_LIBRARY:
+        return StreamingResponse(
+            stream_template("library.html", {"request": request, **context}),
+            media_type="text/html",
+        )
     return templates.TemplateResponse(
         request=request,
         name="library.html",
-        context={"remote": remote, "local": local, "ollama_address": OLLAMA_ADDRESS},
+        context=context,
+    )
+
+
+@app.get("/tags/{model_name}", response_class=HTMLResponse)
+async def read_tags(request: Request, model_name: str):
+    manager = ollama_manager()
+    try:
+        await oregistry.aget_tags(model_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model {model_name}")
+    model = oregistry.catalog.models[model_name]
+    return templates.TemplateResponse(
+        request=request,
+        name="tags.html",
+        context={
+            "model": model,
+            "model_name": model_name,
+            "local": manager.catalog,
+            "fleet_nodes": FLEET_NODES,
+        },
+    )
+
+
+def catalog_owner(which: str):
+    if which == "remote":
+        return oregistry
+    if which == "local":
+        return ollama_manager()
+    raise HTTPException(status_code=404, detail=f"Unknown catalog {which}")
+
+
+@app.get("/api/catalog/{which}")
+async def get_catalog(which: str):
+    """
+    Returns the remote or local catalog, including its generation and epoch.
+    """
+    owner = catalog_owner(which)
+    return {**owner.catalog.model_dump(mode="json"), "epoch": owner.epoch}
+
+
+@app.get("/api/catalog/{which}/changes")
+async def get_catalog_changes(which: str, since: int, epoch: str = None):
+    """
+    Returns the models and tags added, removed or changed after generation since.
+
+    If the changes are no longer in the change log, or since is not a generation of
+    this catalog, e.g. because epoch is not the catalog's epoch since a restart,
+    "reset" is true and the whole catalog has to be fetched again.
+    """
+    owner = catalog_owner(which)
+    generation = owner.catalog.generation
+    changes = (
+        owner.changes_since(since)
+        if epoch == owner.epoch and since <= generation
+        else None
+    )
+    if changes:
+        generation = max(generation, changes[-1].generation)
+    return {
+        "name": owner.catalog.name,
+        "epoch": owner.epoch,
+        "generation": generation,
+        "since": since,
+        "reset": changes is None,
+        "changes": [change.model_dump(mode="json") for change in changes or []],
+    }
+
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def ndjson_chunks(lines, compress: bool = False):
+    """
+    Joins NDJSON lines into chunks of about EXPORT_CHUNK_SIZE bytes, gzip compressed if compress.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = []
+    size = 0
+    for line in lines:
+        data = line.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= EXPORT_CHUNK_SIZE:
+            chunk = b"".join(buffer)
+            buffer, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    chunk = b"".join(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+@app.get("/api/catalog/{which}/export")
+def get_catalog_export(which: str, per: str = "model", gzip: bool = False):
+    """
+    Streams the remote or local catalog as NDJSON, one record per model or per tag.
+    """
+    if per not in ("model", "tag"):
+        raise HTTPException(status_code=400, detail=f"Cannot export one record per {per}")
+    owner = catalog_owner(which)
+    catalog = owner.catalog
+    filename = f"{catalog.name}.ndjson{'.gz' if gzip else ''}"
+    return StreamingResponse(
+        ndjson_chunks(catalog.iter_ndjson(per=per), compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Catalog-Generation": f"{catalog.generation}",
+            "X-Catalog-Epoch": owner.epoch,
+        },
     )
 
 
@@ -232,7 +741,7 @@ async def status(request: Request, job_type: str, identifier: str):
         if MOCK_REMOTE_TRAFFIC:
             status = mock_job_stack["jobs"].get(identifier, "job undefined...")
         else:
-            status = omanager.context["jobs"].get(
+            status = ollama_manager().context["jobs"].get(
                 identifier, "job with that identifier is undefined"
             )
         finish_code = status["finish_code"]
@@ -258,6 +767,31 @@ async def status(request: Request, job_type: str, identifier: str):
                     "job_type": f"{job_type}",
                 },
             )
+    elif job_type == "distribute-model":
+        status = ollama_manager().context["jobs"].get(identifier)
+        if status is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job {identifier}")
+        finish_code = status["finish_code"]
+        if not status["status"] == "done":
+            return templates.TemplateResponse(
+                request=request,
+                name="message-poll.html",
+                context={
+                    "identifier": f"{identifier}",
+                    "message": f"{finish_code}: {status['status']}",
+                    "job_type": f"{job_type}",
+                },
+            )
+        return templates.TemplateResponse(
+            request=request,
+            headers={"HX-Trigger": f"{finish_code}"},
+            name="message.html",
+            context={
+                "identifier": f"{identifier}",
+                "message": f"{finish_code}: {status.get('summary', 'done')}",
+                "job_type": f"{job_type}",
+            },
+        )
     elif job_type == "refresh-library":
         try:
             if MOCK_REMOTE_TRAFFIC:
@@ -294,15 +828,30 @@ async def status(request: Request, job_type: str, identifier: str):
             )
 
 
-# TODO: Add a /local endpoint to see all downloaded models in one view.
-# @app.get("/local", response_class=HTMLResponse)
-# async def read_root(request: Request):
-#     return templates.TemplateResponse(
-#         request=request,
-#         name="library.html",
-#         context={"remote": oregistry.catalog, "local": omanager.catalog},
-#     )
-#
+@app.get("/local", response_class=HTMLResponse)
+async def read_local(request: Request):
+    """
+    Lists all installed models and tags with their details in one view.
+    """
+    return templates.TemplateResponse(
+        request=request,
+        name="local.html",
+        context={"local": ollama_manager().catalog, "ollama_address": OLLAMA_ADDRESS},
+    )
+
+
+@app.get("/health", response_class=HTMLResponse)
+async def read_health(request: Request):
+    """
+    Renders the status of the monitored nodes from their last samples, never probes.
+    """
+    return templates.TemplateResponse(
+        request=request, name="health.html", context={"monitors": monitors}
+    )
+
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    if WORKERS > 1:
+        uvicorn.run("main:app", host="0.0.0.0", port=8001, workers=WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8001)
@@ -0,0 +1,252 @@
+"""
+Offline catalog bundles, for nodes which cannot reach ollama.com or should not
+have to crawl it before they are useful.
+
+A bundle is a gzip compressed NDJSON file. The first line is a BundleHeader,
+every following line one model of the remote catalog, including its tags, as
+written by Catalog.iter_ndjson(per="model").
+
+Usage:
+    python -m wollama.bundle export catalog.ndjson.gz           # from the cached catalog
+    python -m wollama.bundle export catalog.ndjson.gz --refresh # crawl ollama.com first
+    python -m wollama.bundle import catalog.ndjson.gz --mode merge
+    python -m wollama.bundle info catalog.ndjson.gz
+
+Or set CATALOG_BUNDLE=/path/to/catalog.ndjson.gz to import a bundle on startup.
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from log2d import Log
+from pydantic import BaseModel
+
+from wollama.changes import Change, diff_models
+from wollama.profiling import span
+from wollama.wollama import Catalog, CatalogLLM, OllamaRegistry
+
+log = Log(Path(__file__).stem).logger
+LOG_LEVEL = "INFO"
+log.setLevel(level=f"{LOG_LEVEL}")
+
+BUNDLE_FORMAT = "wollama-catalog-bundle"
+BUNDLE_VERSION = 1
+MODES = ("replace", "merge")
+
+
+class BundleHeader(BaseModel):
+    """
+    The first line of a bundle, describing what follows.
+
+    Attributes:
+        format: str: Always "wollama-catalog-bundle".
+        version: int: The version of the bundle format.
+        name: str: The name of the catalog, e.g. "remote-ollama-catalog".
+        object_version: str: The catalog schema version.
+        generation: int: The generation of the exported catalog snapshot.
+        created: float: When the bundle was written, seconds since the epoch.
+        source: str = None: The library url the catalog was crawled from.
+        models: int: The number of model lines which follow.
+        tags_fetched_at: Dict[str, float]: When the tags of each model were fetched.
+        validators: Dict[str, dict]: The ETag / Last-Modified of every crawled page, by url.
+    """
+
+    format: str = BUNDLE_FORMAT
+    version: int = BUNDLE_VERSION
+    name: str
+    object_version: str
+    generation: int = 0
+    created: float
+    source: Optional[str] = None
+    models: int
+    tags_fetched_at: Dict[str, float] = {}
+    validators: Dict[str, dict] = {}
+
+
+def export_bundle(registry: OllamaRegistry, filepath: str) -> BundleHeader:
+    """
+    Writes the registry's current catalog snapshot to a bundle.
+
+    Returns:
+        BundleHeader: The header of the written bundle.
+    """
+    catalog = registry.catalog
+    header = BundleHeader(
+        name=catalog.name,
+        object_version=catalog.object_version,
+        generation=catalog.generation,
+        created=time.time(),
+        source=registry.url,
+        models=len(catalog.models),
+        tags_fetched_at={
+            name: fetched_at
+            for name, fetched_at in registry.tags_fetched_at.items()
+            if name in catalog.models
+        },
+        validators=dict(registry.validators),
+    )
+    with span("export_bundle", catalog=catalog.name), gzip.open(
+        filepath, "wt", encoding="utf-8"
+    ) as file:
+        file.write(header.model_dump_json() + "\n")
+        for line in catalog.iter_ndjson(per="model"):
+            file.write(line)
+    log.info(f"Exported {header.models} models of {catalog.name} to {filepath}")
+    return header
+
+
+def read_header(filepath: str) -> BundleHeader:
+    """
+    Reads the header of a bundle.
+
+    Raises:
+        ValueError: If the file is not a bundle or of a newer format version.
+    """
+    try:
+        with gzip.open(filepath, "rt", encoding="utf-8") as file:
+            header = BundleHeader.model_validate_json(file.readline())
+    except Exception as e:
+        raise ValueError(f"{filepath} is not a catalog bundle: {e}")
+    if header.format != BUNDLE_FORMAT or header.version > BUNDLE_VERSION:
+        raise ValueError(
+            f"{filepath} is a {header.format} version {header.version} file, "
+            f"expected {BUNDLE_FORMAT} version {BUNDLE_VERSION} or older"
+        )
+    return header
+
+
+def iter_models(filepath: str) -> Iterator[CatalogLLM]:
+    """
+    Yields the models of a bundle one line at a time.
+    """
+    with gzip.open(filepath, "rt", encoding="utf-8") as file:
+        file.readline()
+        for line in file:
+            if line.strip():
+                yield CatalogLLM.model_validate_json(line)
+
+
+def import_bundle(registry: OllamaRegistry, filepath: str, mode: str = "merge") -> int:
+    """
+    Imports a bundle into the registry's catalog.
+
+    The models are applied one at a time as they are read, so the bundle is
+    never held in memory next to the catalog it builds.
+
+    Args:
+        registry (OllamaRegistry): The registry to import into.
+        filepath (str): The bundle.
+        mode (str): "replace" to adopt the bundle's catalog as it is, "merge" to add
+            its models and take its tags where ours are missing or were fetched
+            less recently, keeping models the bundle does not have.
+
+    Returns:
+        int: The number of changes, published to the change feed like a refresh.
+
+    Raises:
+        ValueError: If mode is unknown, or the file is not a bundle of this catalog.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown bundle import mode {mode}, expected one of {MODES}")
+    header = read_header(filepath)
+    if header.name != registry.catalog.name:
+        raise ValueError(f"{filepath} holds {header.name}, not {registry.catalog.name}")
+    with span("import_bundle", catalog=header.name, mode=mode):
+        with registry.shared_update() as changes:
+            previous = registry.catalog
+            # Readers keep the previous snapshot until the new one is complete.
+            if mode == "replace":
+                models = {}
+                fetched_at = dict(header.tags_fetched_at)
+            else:
+                models = dict(previous.models)
+                fetched_at = dict(registry.tags_fetched_at)
+            for model in iter_models(filepath):
+                if mode == "merge":
+                    ours = models.get(model.name)
+                    theirs_at = header.tags_fetched_at.get(model.name, 0)
+                    if (
+                        ours is not None
+                        and (ours.tag_collection.tags or not model.tag_collection.tags)
+                        and fetched_at.get(model.name, 0) >= theirs_at
+                    ):
+                        continue
+                    if theirs_at:
+                        fetched_at[model.name] = theirs_at
+                changes.extend(
+                    diff_models(model.name, previous.models.get(model.name), model)
+                )
+                models[model.name] = model
+            if mode == "replace":
+                catalog = Catalog(name=previous.name, generation=previous.generation)
+                catalog.models = models
+                changes.extend(
+                    Change(action="removed", model=name)
+                    for name in previous.models.keys() - models.keys()
+                )
+            else:
+                catalog = previous.model_copy(update={"models": models})
+            registry.catalog = catalog
+            registry.tags_fetched_at = fetched_at
+            registry.validators = (
+                dict(header.validators)
+                if mode == "replace"
+                else {**header.validators, **registry.validators}
+            )
+    log.info(
+        f"Imported {header.models} models from {filepath} ({mode}), "
+        f"{len(changes)} changes, bundle created {time.ctime(header.created)}"
+    )
+    return len(changes)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cache-dir", default=None, help="The registry's cache directory.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Write the cached catalog to a bundle.")
+    export_parser.add_argument("bundle")
+    export_parser.add_argument("--refresh", action="store_true", help="Crawl the library first.")
+    export_parser.add_argument("--url", default="https://ollama.com/library")
+    import_parser = commands.add_parser("import", help="Import a bundle into the cache.")
+    import_parser.add_argument("bundle")
+    import_parser.add_argument("--mode", choices=MODES, default="merge")
+    info_parser = commands.add_parser("info", help="Print the header of a bundle.")
+    info_parser.add_argument("bundle")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        header = read_header(args.bundle)
+        print(header.model_dump_json(indent=2, exclude={"tags_fetched_at", "validators"}))
+        return 0
+
+    options = {}
+    if args.cache_dir:
+        os.makedirs(args.cache_dir, exist_ok=True)
+        options["cache_dir"] = args.cache_dir
+    if args.command == "export":
+        registry = OllamaRegistry(url=args.url, **options)
+        if args.refresh:
+            registry.refresh()
+        else:
+            registry.load_from_cache()
+        export_bundle(registry, args.bundle)
+        return 0
+
+    registry = OllamaRegistry(**options)
+    try:
+        registry.load_from_cache()
+    except Exception:
+        log.info("No cached catalog, importing into an empty one.")
+    import_bundle(registry, args.bundle, mode=args.mode)
+    registry.save_to_cache()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import uuid
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from pydantic import BaseModel
+
+
+class Change(BaseModel):
+    """
+    A model or tag which was added to, removed from or changed in a catalog.
+
+    Attributes:
+        generation: int: The catalog generation which introduced the change.
+        action: str: "added", "removed" or "changed".
+        model: str: The name of the model, e.g. "llama3.2".
+        tag: str = None: The name of the tag, None for a change of the model itself.
+        entry: dict = None: The new model (without tags) or tag, None if removed.
+    """
+
+    generation: int = 0
+    action: str
+    model: str
+    tag: Optional[str] = None
+    entry: Optional[Dict[str, Any]] = None
+
+
+def _model_entry(model) -> dict:
+    return {
+        "name": model.name,
+        "link": model.link,
+        "short_description": model.short_description,
+    }
+
+
+def _tag_entry(tag) -> dict:
+    return tag.model_dump(mode="json")
+
+
+def diff_tags(model_name: str, old_tags: dict, new_tags: dict) -> List[Change]:
+    """
+    Returns the changes which turn the tags old_tags of a model into new_tags.
+    """
+    changes = []
+    for name, tag in new_tags.items():
+        old_tag = old_tags.get(name)
+        if old_tag is None:
+            changes.append(
+                Change(action="added", model=model_name, tag=name, entry=_tag_entry(tag))
+            )
+        elif old_tag != tag:
+            changes.append(
+                Change(action="changed", model=model_name, tag=name, entry=_tag_entry(tag))
+            )
+    for name in old_tags.keys() - new_tags.keys():
+        changes.append(Change(action="removed", model=model_name, tag=name))
+    return changes
+
+
+def added_model(model) -> List[Change]:
+    """
+    Returns the changes which add a model and all of its tags.
+    """
+    return [Change(action="added", model=model.name, entry=_model_entry(model))] + diff_tags(
+        model.name, {}, model.tag_collection.tags
+    )
+
+
+def diff_models(name: str, old_model, new_model) -> List[Change]:
+    """
+    Returns the changes which turn the model old_model, None if there was none,
+    into new_model.
+    """
+    if old_model is None:
+        return added_model(new_model)
+    changes = []
+    if _model_entry(old_model) != _model_entry(new_model):
+        changes.append(Change(action="changed", model=name, entry=_model_entry(new_model)))
+    if old_model.tag_collection is not new_model.tag_collection:
+        changes.extend(
+            diff_tags(name, old_model.tag_collection.tags, new_model.tag_collection.tags)
+        )
+    return changes
+
+
+def diff_catalogs(old, new) -> List[Change]:
+    """
+    Returns the changes which turn the catalog old into the catalog new.
+    """
+    changes = []
+    for name, model in new.models.items():
+        changes.extend(diff_models(name, old.models.get(name), model))
+    for name in old.models.keys() - new.models.keys():
+        changes.append(Change(action="removed", model=name))
+    return changes
+
+
+class ChangeLog:
+    """
+    A bounded log of the changes of the last `size` catalog generations.
+
+    The log is complete for all generations after `floor`. Clients which last
+    synced before the floor have to fetch the whole catalog again. So do clients
+    which synced with another log, e.g. of a previous process, whose generations
+    started over: every log has a random `epoch` for clients to check.
+
+    Usage:
+        changes = log.since(generation)
+        if changes is None:
+            ...  # too old, fetch the whole catalog
+    """
+
+    def __init__(self, size: int = 1000, floor: int = 0):
+        self.size = size
+        self.floor = floor
+        self.epoch = uuid.uuid4().hex
+        self._batches = deque()
+
+    def record(self, generation: int, changes: Optional[Iterable[Change]]):
+        """
+        Records the changes of a generation, None if they are unknown.
+        """
+        if changes is None:
+            self._batches.clear()
+            self.floor = generation
+            return
+        self._batches.append((generation, list(changes)))
+        while len(self._batches) > self.size:
+            self.floor = self._batches.popleft()[0]
+
+    def since(self, generation: int) -> Optional[List[Change]]:
+        """
+        Returns the changes after generation, None if they are no longer in the log.
+        """
+        if generation < self.floor:
+            return None
+        return [
+            change
+            for batch_generation, batch in self._batches
+            if batch_generation > generation
+            for change in batch
+        ]
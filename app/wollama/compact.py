@@ -0,0 +1,288 @@
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from wollama.wollama import (
+    Catalog,
+    CatalogLLM,
+    ModelTag,
+    ModelTagCollection,
+    OllamaInfo,
+)
+
+
+class CompactCatalog:
+    """
+    A read-only, array-backed representation of a Catalog.
+
+    Strings are interned into one table and models and tags are stored as columns
+    of indexes into that table. Every model owns the contiguous range of tags
+    [tag_start, tag_end). This avoids the per-object overhead and validation cost
+    of building a pydantic ModelTag, ModelTagCollection and CatalogLLM per entry.
+
+    The views returned by `models` behave like the pydantic objects as far as
+    reading is concerned, e.g. in library.html:
+
+        for model in catalog.models.values():
+            for tag in model.tag_collection.tags.values():
+                tag.name, tag.link
+
+    Attributes:
+        name: str: The name of the catalog, e.g. "remote-ollama-catalog".
+        object_version: str: The schema version of the catalog it was built from.
+    """
+
+    __slots__ = (
+        "name",
+        "object_version",
+        "strings",
+        "_string_index",
+        "model_name",
+        "model_link",
+        "model_description",
+        "tag_start",
+        "tag_end",
+        "tag_name",
+        "tag_link",
+        "tag_info",
+        "_model_index",
+    )
+
+    def __init__(self, name: str = "ollama-catalog", object_version: str = "0.0.0"):
+        self.name = name
+        self.object_version = object_version
+        self.strings: List[str] = []
+        self._string_index: Dict[str, int] = {}
+        self.model_name = array("I")
+        self.model_link = array("I")
+        self.model_description = array("I")
+        self.tag_start = array("I")
+        self.tag_end = array("I")
+        self.tag_name = array("I")
+        self.tag_link = array("I")
+        # Only installed tags carry ollama info, so store it sparsely.
+        self.tag_info: Dict[int, OllamaInfo] = {}
+        self._model_index: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        index = self._string_index.get(value)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(value)
+            self._string_index[value] = index
+        return index
+
+    def add_model(
+        self,
+        name: str,
+        link: str = "",
+        short_description: str = "",
+        tags: Iterable[Tuple[str, str]] = (),
+        tag_info: Optional[Dict[str, OllamaInfo]] = None,
+    ):
+        """
+        Appends a model and its (tag name, tag link) pairs.
+        """
+        if name in self._model_index:
+            raise ValueError(f"{name} is already in the catalog")
+        self._model_index[name] = len(self.model_name)
+        self.model_name.append(self.intern(name))
+        self.model_link.append(self.intern(link))
+        self.model_description.append(self.intern(short_description))
+        self.tag_start.append(len(self.tag_name))
+        for tag_name, tag_link in tags:
+            if tag_info and tag_name in tag_info:
+                self.tag_info[len(self.tag_name)] = tag_info[tag_name]
+            self.tag_name.append(self.intern(tag_name))
+            self.tag_link.append(self.intern(tag_link))
+        self.tag_end.append(len(self.tag_name))
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[tuple], name: str = "ollama-catalog"
+    ) -> "CompactCatalog":
+        """
+        Builds a catalog from (name, link, short description, [(tag, tag link), ...]) records.
+        """
+        catalog = cls(name=name)
+        for model_name, link, short_description, tags in records:
+            catalog.add_model(model_name, link, short_description, tags)
+        return catalog
+
+    @classmethod
+    def from_catalog(cls, catalog: Catalog) -> "CompactCatalog":
+        compact = cls(name=catalog.name, object_version=catalog.object_version)
+        for model in catalog.models.values():
+            tags = model.tag_collection.tags
+            compact.add_model(
+                model.name,
+                model.link,
+                model.short_description,
+                [(tag.name, tag.link) for tag in tags.values()],
+                {tag.name: tag.ollama_info for tag in tags.values() if tag.ollama_info},
+            )
+        return compact
+
+    def to_catalog(self) -> Catalog:
+        """
+        Converts the compact catalog back into a pydantic Catalog.
+        """
+        catalog = Catalog(name=self.name, object_version=self.object_version)
+        models = {}
+        for model in self.models.values():
+            tag_collection = ModelTagCollection()
+            tags = {}
+            for tag in model.tag_collection.tags.values():
+                tags[tag.name] = ModelTag(name=tag.name, link=tag.link)
+                if tag.ollama_info is not None:
+                    tags[tag.name].ollama_info = tag.ollama_info
+            tag_collection.tags = tags
+            models[model.name] = CatalogLLM(
+                name=model.name,
+                link=model.link,
+                short_description=model.short_description,
+                tag_collection=tag_collection,
+            )
+        catalog.models = models
+        return catalog
+
+    @property
+    def models(self) -> "ModelsView":
+        return ModelsView(self)
+
+
+class ModelsView(Mapping):
+    """
+    A read-only mapping of model name -> ModelView.
+    """
+
+    __slots__ = ("_catalog",)
+
+    def __init__(self, catalog: CompactCatalog):
+        self._catalog = catalog
+
+    def __getitem__(self, name: str) -> "ModelView":
+        return ModelView(self._catalog, self._catalog._model_index[name])
+
+    def __contains__(self, name) -> bool:
+        return name in self._catalog._model_index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._catalog._model_index)
+
+    def __len__(self) -> int:
+        return len(self._catalog.model_name)
+
+    def values(self) -> Iterator["ModelView"]:
+        catalog = self._catalog
+        return (ModelView(catalog, index) for index in range(len(catalog.model_name)))
+
+
+class ModelView:
+    """
+    A read-only view of one model, shaped like a CatalogLLM.
+    """
+
+    __slots__ = ("_catalog", "_index")
+
+    def __init__(self, catalog: CompactCatalog, index: int):
+        self._catalog = catalog
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return self._catalog.strings[self._catalog.model_name[self._index]]
+
+    @property
+    def link(self) -> str:
+        return self._catalog.strings[self._catalog.model_link[self._index]]
+
+    @property
+    def short_description(self) -> str:
+        return self._catalog.strings[self._catalog.model_description[self._index]]
+
+    @property
+    def tag_collection(self) -> "TagCollectionView":
+        return TagCollectionView(self._catalog, self._index)
+
+
+class TagCollectionView:
+    """
+    A read-only view of the tags of one model, shaped like a ModelTagCollection.
+    """
+
+    __slots__ = ("tags",)
+
+    def __init__(self, catalog: CompactCatalog, model_index: int):
+        self.tags = TagsView(
+            catalog, catalog.tag_start[model_index], catalog.tag_end[model_index]
+        )
+
+
+class TagsView(Mapping):
+    """
+    A read-only mapping of tag name -> TagView over one model's tag range.
+    """
+
+    __slots__ = ("_catalog", "_start", "_end")
+
+    def __init__(self, catalog: CompactCatalog, start: int, end: int):
+        self._catalog = catalog
+        self._start = start
+        self._end = end
+
+    def _find(self, name: str) -> int:
+        catalog = self._catalog
+        string_index = catalog._string_index.get(name)
+        if string_index is not None:
+            for index in range(self._start, self._end):
+                if catalog.tag_name[index] == string_index:
+                    return index
+        return -1
+
+    def __getitem__(self, name: str) -> "TagView":
+        index = self._find(name)
+        if index < 0:
+            raise KeyError(name)
+        return TagView(self._catalog, index)
+
+    def __contains__(self, name) -> bool:
+        return self._find(name) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        catalog = self._catalog
+        return (
+            catalog.strings[catalog.tag_name[index]]
+            for index in range(self._start, self._end)
+        )
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def values(self) -> Iterator["TagView"]:
+        catalog = self._catalog
+        return (TagView(catalog, index) for index in range(self._start, self._end))
+
+
+class TagView:
+    """
+    A read-only view of one tag, shaped like a ModelTag.
+    """
+
+    __slots__ = ("_catalog", "_index")
+
+    def __init__(self, catalog: CompactCatalog, index: int):
+        self._catalog = catalog
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return self._catalog.strings[self._catalog.tag_name[self._index]]
+
+    @property
+    def link(self) -> str:
+        return self._catalog.strings[self._catalog.tag_link[self._index]]
+
+    @property
+    def ollama_info(self) -> Optional[OllamaInfo]:
+        return self._catalog.tag_info.get(self._index)
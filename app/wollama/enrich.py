@@ -0,0 +1,175 @@
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from log2d import Log
+from ollama import AsyncClient, ShowResponse
+from pydantic import BaseModel
+
+from wollama.logqueue import format_fields
+from wollama.profiling import span
+
+log = Log(Path(__file__).stem).logger
+LOG_LEVEL = "INFO"
+log.setLevel(level=f"{LOG_LEVEL}")
+
+
+class TagDetails(BaseModel):
+    """
+    What `ollama show` reports about an installed tag, reduced to what the UI shows.
+
+    Attributes:
+        digest: str: The digest of the tag's manifest, which the details are cached by.
+        size: int = None: The size on disk in bytes.
+        family: str = None: The model family, e.g. "llama".
+        parameter_size: str = None: The parameter size as Ollama formats it, e.g. "3.2B".
+        parameter_count: int = None: The exact number of parameters.
+        quantization_level: str = None: The quantization, e.g. "Q4_K_M".
+        context_length: int = None: The maximum context length in tokens.
+        license: str = None: The first line of the license, e.g. "Apache License".
+        capabilities: List[str] = []: E.g. ["completion", "tools"].
+    """
+
+    digest: str
+    size: Optional[int] = None
+    family: Optional[str] = None
+    parameter_size: Optional[str] = None
+    parameter_count: Optional[int] = None
+    quantization_level: Optional[str] = None
+    context_length: Optional[int] = None
+    license: Optional[str] = None
+    capabilities: List[str] = []
+
+    @classmethod
+    def from_show(cls, response: ShowResponse, digest: str, size: int = None) -> "TagDetails":
+        details = response.details
+        modelinfo = response.modelinfo or {}
+        architecture = modelinfo.get("general.architecture")
+        license_lines = [line.strip() for line in (response.license or "").splitlines()]
+        return cls(
+            digest=digest,
+            size=size,
+            family=details.family if details else None,
+            parameter_size=details.parameter_size if details else None,
+            parameter_count=modelinfo.get("general.parameter_count"),
+            quantization_level=details.quantization_level if details else None,
+            context_length=modelinfo.get(f"{architecture}.context_length"),
+            license=next((line[:80] for line in license_lines if line), None),
+            capabilities=list(response.capabilities or []),
+        )
+
+    def summary(self) -> str:
+        """
+        Returns a one line summary, e.g. "3.2B · Q4_K_M · 128k context · 2.0 GB".
+        """
+        parts = [self.parameter_size, self.quantization_level]
+        if self.context_length:
+            parts.append(f"{self.context_length // 1024}k context")
+        parts.append(self.size_label())
+        parts.append(self.license)
+        return " · ".join(part for part in parts if part)
+
+    def size_label(self) -> str:
+        """
+        Returns the size on disk, e.g. "2.0 GB" or "274 MB", "" if unknown.
+        """
+        if not self.size:
+            return ""
+        if self.size >= 1e9:
+            return f"{self.size / 1e9:.1f} GB"
+        return f"{self.size / 1e6:.0f} MB"
+
+
+class DetailsCache:
+    """
+    TagDetails by digest, kept in a JSON file so that unchanged models are never
+    queried again, even across restarts. A tag which is pulled again with new
+    weights gets a new digest and is queried again.
+
+    Attributes:
+        path: str = None: The JSON file, None to keep the details in memory only.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.details: Dict[str, TagDetails] = {}
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path) as file:
+                    self.details = {
+                        digest: TagDetails(**details)
+                        for digest, details in json.load(file).items()
+                    }
+            except Exception as e:
+                log.error(f"Could not load the model details cache, starting empty: {e}")
+
+    def get(self, digest: str) -> Optional[TagDetails]:
+        return self.details.get(digest)
+
+    def put(self, details: TagDetails):
+        self.details[details.digest] = details
+
+    def save(self):
+        if self.path is None:
+            return
+        data = {digest: details.model_dump() for digest, details in self.details.items()}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".model-details.")
+        with os.fdopen(fd, "w") as file:
+            json.dump(data, file)
+        os.replace(temp_path, self.path)
+
+
+async def fetch_details(
+    aclient: AsyncClient,
+    installed: Dict[str, tuple],
+    cache: DetailsCache,
+    concurrency: int = 4,
+) -> Dict[str, TagDetails]:
+    """
+    Returns the details of installed tags, calling show() for those not in the cache.
+
+    Args:
+        aclient (AsyncClient): The Ollama client.
+        installed (Dict[str, tuple]): "model:tag" -> (digest, size) of the installed tags.
+        cache (DetailsCache): Details by digest, updated and saved if anything was fetched.
+        concurrency (int): The maximum number of concurrent show() calls.
+
+    Returns:
+        Dict[str, TagDetails]: "model:tag" -> details, without tags whose show() failed.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def show(model: str, digest: str, size: int) -> TagDetails:
+        async with semaphore:
+            response = await aclient.show(model)
+        return TagDetails.from_show(response, digest=digest, size=size)
+
+    missing = [
+        (model, digest, size)
+        for model, (digest, size) in installed.items()
+        if cache.get(digest) is None
+    ]
+    if missing:
+        with span("fetch_details", models=len(missing)):
+            results = await asyncio.gather(
+                *(show(*entry) for entry in missing), return_exceptions=True
+            )
+        for (model, digest, size), result in zip(missing, results):
+            if isinstance(result, BaseException):
+                log.error(format_fields(event="show", model=model, error=result))
+            else:
+                cache.put(result)
+        await asyncio.to_thread(cache.save)
+    log.info(
+        format_fields(event="details", installed=len(installed), fetched=len(missing))
+    )
+    return {
+        model: cache.get(digest)
+        for model, (digest, size) in installed.items()
+        if cache.get(digest) is not None
+    }
@@ -0,0 +1,273 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from log2d import Log
+from pydantic import BaseModel
+
+from wollama.logqueue import ProgressLogger, format_fields
+
+if TYPE_CHECKING:
+    import aiohttp
+
+log = Log(Path(__file__).stem).logger
+LOG_LEVEL = "INFO"
+log.setLevel(level=f"{LOG_LEVEL}")
+
+MEDIA_TYPE_PREFIX = "application/vnd.ollama.image."
+
+
+class FleetError(Exception):
+    """
+    Raised when a model could not be copied to a node.
+    """
+
+
+def manifest_path(models_dir: str, model: str, tag: str) -> Path:
+    """
+    Returns the path of a model's manifest in an Ollama models directory.
+
+    "llama3.2" lives in registry.ollama.ai/library/llama3.2, "user/model" in
+    registry.ollama.ai/user/model and "host/namespace/model" as it is.
+    """
+    parts = model.split("/")
+    if len(parts) == 1:
+        parts = ["registry.ollama.ai", "library", *parts]
+    elif len(parts) == 2:
+        parts = ["registry.ollama.ai", *parts]
+    return Path(models_dir, "manifests", *parts, tag)
+
+
+def blob_path(models_dir: str, digest: str) -> Path:
+    return Path(models_dir, "blobs", digest.replace(":", "-"))
+
+
+class SeedModel(BaseModel):
+    """
+    A model in the models directory of the seed node, described as a request to
+    Ollama's create API plus the blobs the request refers to.
+
+    Attributes:
+        model: str: The name of the model, e.g. "llama3.2".
+        tag: str: The tag of the model, e.g. "1b".
+        files: Dict[str, str]: GGUF file name -> blob digest, the weights and projectors.
+        adapters: Dict[str, str]: GGUF file name -> blob digest of LoRA adapters.
+        template: str = None: The prompt template.
+        system: str = None: The system prompt.
+        license: List[str] = None: The licenses of the model.
+        parameters: Dict[str, Any] = None: The default parameters, e.g. {"stop": [...]}.
+        messages: List[dict] = None: Example messages.
+        sizes: Dict[str, int]: Blob digest -> size in bytes of every blob to upload.
+    """
+
+    model: str
+    tag: str
+    files: Dict[str, str] = {}
+    adapters: Dict[str, str] = {}
+    template: Optional[str] = None
+    system: Optional[str] = None
+    license: Optional[List[str]] = None
+    parameters: Optional[Dict[str, Any]] = None
+    messages: Optional[List[dict]] = None
+    sizes: Dict[str, int] = {}
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.sizes.values())
+
+    def create_request(self) -> dict:
+        request = {"model": f"{self.model}:{self.tag}", "files": self.files}
+        for key in ("adapters", "template", "system", "license", "parameters", "messages"):
+            value = getattr(self, key)
+            if value:
+                request[key] = value
+        return request
+
+
+def read_seed_model(models_dir: str, model: str, tag: str) -> SeedModel:
+    """
+    Reads a model's manifest and its small layers from an Ollama models directory.
+
+    Raises:
+        FleetError: If the model is not in the models directory.
+    """
+    path = manifest_path(models_dir, model, tag)
+    try:
+        manifest = json.loads(path.read_text())
+    except FileNotFoundError:
+        raise FleetError(f"{model}:{tag} is not in {models_dir}")
+    seed = SeedModel(model=model, tag=tag)
+    for layer in manifest.get("layers", []):
+        kind = layer["mediaType"].removeprefix(MEDIA_TYPE_PREFIX)
+        digest = layer["digest"]
+        if kind in ("model", "projector"):
+            seed.files[f"{kind}-{digest[7:19]}.gguf"] = digest
+            seed.sizes[digest] = layer["size"]
+        elif kind == "adapter":
+            seed.adapters[f"adapter-{digest[7:19]}.gguf"] = digest
+            seed.sizes[digest] = layer["size"]
+        elif kind in ("template", "system", "license", "params", "messages"):
+            text = blob_path(models_dir, digest).read_text(encoding="utf-8")
+            if kind == "template":
+                seed.template = text
+            elif kind == "system":
+                seed.system = text
+            elif kind == "license":
+                seed.license = (seed.license or []) + [text]
+            elif kind == "params":
+                seed.parameters = json.loads(text)
+            else:
+                seed.messages = json.loads(text)
+        else:
+            log.warning(format_fields(event="fleet", model=model, tag=tag, skipped_layer=kind))
+    if not seed.files:
+        raise FleetError(f"{model}:{tag} has no model layer")
+    return seed
+
+
+def summarize(state: Dict[str, dict]) -> str:
+    """
+    Summarizes the progress of all nodes, e.g. "1/3 nodes done, 42% copied, 1 failed".
+    """
+    done = sum(1 for node in state.values() if node["status"] == "done")
+    failed = sum(1 for node in state.values() if node["status"] == "failed")
+    total = sum(node["total"] for node in state.values())
+    sent = sum(node["sent"] for node in state.values())
+    summary = f"{done}/{len(state)} nodes done, {sent * 100 // total if total else 100}% copied"
+    if failed:
+        summary += f", {failed} failed"
+    return summary
+
+
+class FleetDistributor:
+    """
+    Copies models from the seed node to the other Ollama nodes of a fleet, so a
+    model is downloaded from the internet once instead of once per node.
+
+    Ollama has no API to download blobs, so they are read from the seed's models
+    directory. Every node receives the blobs it is missing through the blob
+    upload API, then the model is created from them through the create API.
+    Nodes are copied to in parallel.
+
+    Attributes:
+        models_dir: str: The models directory of the seed node, e.g. ~/.ollama/models.
+        nodes: List[str]: The addresses of the other nodes, e.g. ["http://gpu-2:11434"].
+        chunk_size: int = 1 MiB: The size of the pieces blobs are read and sent in.
+        timeout: float = 300: Seconds without progress after which a transfer fails.
+    """
+
+    def __init__(
+        self,
+        models_dir: str,
+        nodes: List[str],
+        chunk_size: int = 1024 * 1024,
+        timeout: float = 300,
+    ):
+        self.models_dir = models_dir
+        self.nodes = [node.rstrip("/") for node in nodes]
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+
+    async def distribute(
+        self,
+        model: str,
+        tag: str,
+        report: Callable[[Dict[str, dict]], None] = None,
+    ) -> Dict[str, dict]:
+        """
+        Copies model:tag from the seed to every node.
+
+        Args:
+            model (str): The name of the model, e.g. "llama3.2".
+            tag (str): The tag of the model, e.g. "1b".
+            report (Callable): Called with the state of all nodes whenever it changes.
+
+        Returns:
+            Dict[str, dict]: node -> {"status", "sent", "total", "error"}, where status
+                is "done" or "failed".
+
+        Raises:
+            FleetError: If the model is not on the seed.
+        """
+        import aiohttp
+
+        seed = await asyncio.to_thread(read_seed_model, self.models_dir, model, tag)
+        state = {
+            node: {"status": "waiting", "sent": 0, "total": seed.total_bytes, "error": None}
+            for node in self.nodes
+        }
+        report = report if report else (lambda state: None)
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            results = await asyncio.gather(
+                *(self._push(session, node, seed, state, report) for node in self.nodes),
+                return_exceptions=True,
+            )
+        for node, result in zip(self.nodes, results):
+            if isinstance(result, BaseException):
+                state[node]["status"] = "failed"
+                state[node]["error"] = f"{type(result).__name__}: {result}"
+                log.error(
+                    format_fields(event="fleet", model=model, tag=tag, node=node, error=result)
+                )
+        report(state)
+        return state
+
+    async def _push(
+        self,
+        session: "aiohttp.ClientSession",
+        node: str,
+        seed: SeedModel,
+        state: Dict[str, dict],
+        report: Callable,
+    ):
+        progress = ProgressLogger(log, "fleet", model=seed.model, tag=seed.tag, node=node)
+        node_state = state[node]
+        for digest, size in seed.sizes.items():
+            async with session.head(f"{node}/api/blobs/{digest}") as response:
+                exists = response.status == 200
+            if exists:
+                node_state["sent"] += size
+                progress.update("blob exists", digest=digest)
+                report(state)
+                continue
+            node_state["status"] = "uploading"
+            async with session.post(
+                f"{node}/api/blobs/{digest}",
+                data=self._read_blob(digest, node_state, state, report),
+            ) as response:
+                if response.status >= 400:
+                    raise FleetError(
+                        f"Upload of {digest} failed: {response.status} {await response.text()}"
+                    )
+            progress.update("blob uploaded", digest=digest, size=size)
+
+        node_state["status"] = "creating"
+        report(state)
+        async with session.post(
+            f"{node}/api/create", json={**seed.create_request(), "stream": True}
+        ) as response:
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                message = json.loads(line)
+                if "error" in message:
+                    raise FleetError(message["error"])
+                progress.update(message.get("status", ""))
+            if response.status >= 400:
+                raise FleetError(f"Create failed: {response.status}")
+        node_state["status"] = "done"
+        progress.finish("done")
+        report(state)
+
+    async def _read_blob(self, digest: str, node_state: dict, state: dict, report: Callable):
+        path = blob_path(self.models_dir, digest)
+        with open(path, "rb") as file:
+            while True:
+                chunk = await asyncio.to_thread(file.read, self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+                node_state["sent"] += len(chunk)
+                report(state)
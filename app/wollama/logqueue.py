@@ -0,0 +1,166 @@
+import atexit
+import json
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, List, Optional
+
+from log2d import Log
+
+_listener: Optional[QueueListener] = None
+_handlers: Dict[str, List[logging.Handler]] = {}
+
+
+class _Dispatcher(logging.Handler):
+    """
+    Hands a record from the queue to the handlers of the logger which created it.
+    """
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in _handlers.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+
+def enable_queued_logging(names: Iterable[str] = None) -> QueueListener:
+    """
+    Moves the handlers of log2d loggers onto a background thread.
+
+    Logging calls then only put the record on a queue, so slow handlers (a
+    terminal, a file on a busy disk) never block the event loop. Can be called
+    again to queue loggers created since.
+
+    Args:
+        names (Iterable[str]): The loggers to queue, defaults to all log2d loggers.
+
+    Returns:
+        QueueListener: The running listener.
+    """
+    global _listener
+    if _listener is None:
+        records = queue.SimpleQueue()
+        _listener = QueueListener(records, _Dispatcher())
+        _listener.start()
+        atexit.register(disable_queued_logging)
+    queue_handler = QueueHandler(_listener.queue)
+    for name in names if names is not None else list(Log.index):
+        logger = logging.getLogger(name)
+        if any(isinstance(handler, QueueHandler) for handler in logger.handlers):
+            continue
+        _handlers[name] = list(logger.handlers)
+        for handler in _handlers[name]:
+            logger.removeHandler(handler)
+        logger.addHandler(queue_handler)
+    return _listener
+
+
+def disable_queued_logging():
+    """
+    Writes out the queued records and restores the original handlers.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    for name, handlers in _handlers.items():
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            if isinstance(handler, QueueHandler):
+                logger.removeHandler(handler)
+        for handler in handlers:
+            logger.addHandler(handler)
+    _handlers.clear()
+
+
+def format_fields(**fields) -> str:
+    """
+    Formats fields as key=value pairs, e.g. model=llama3.2 status="pulling manifest".
+
+    Fields which are None are left out, values with spaces are quoted.
+    """
+    pairs = []
+    for key, value in fields.items():
+        if value is None:
+            continue
+        value = f"{value}"
+        if not value or any(character in value for character in ' "='):
+            value = json.dumps(value)
+        pairs.append(f"{key}={value}")
+    return " ".join(pairs)
+
+
+class ProgressLogger:
+    """
+    Rate-limited, sampled logging of a stream of progress events, e.g. the
+    messages of a pull.
+
+    An event is logged when its status differs from the previous event's,
+    when `interval` seconds passed since the last logged event, or when it is
+    one of every `every` events. All other events are counted and the count is
+    reported as `skipped` with the next logged event.
+
+    Usage:
+        progress = ProgressLogger(log, "pull", model="llama3.2", tag="1b")
+        for part in stream:
+            progress.update(part.status, completed=part.completed, total=part.total)
+        progress.finish("success")
+
+    Attributes:
+        logger: logging.Logger: The logger to write to.
+        event: str: The name of the event, the first field of every line.
+        interval: float = 2: The minimum seconds between two lines of the same status.
+        every: int = 0: Additionally log one of every `every` events, 0 to disable.
+        level: int = logging.INFO: The level of the lines.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        event: str,
+        interval: float = 2.0,
+        every: int = 0,
+        level: int = logging.INFO,
+        **context,
+    ):
+        self.logger = logger
+        self.event = event
+        self.interval = interval
+        self.every = every
+        self.level = level
+        self.context = context
+        self.count = 0
+        self.skipped = 0
+        self._status = None
+        self._logged_at = 0.0
+
+    def update(self, status: str, force: bool = False, **fields):
+        self.count += 1
+        now = time.monotonic()
+        if not (
+            force
+            or status != self._status
+            or now - self._logged_at >= self.interval
+            or (self.every and self.count % self.every == 0)
+        ):
+            self.skipped += 1
+            return
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(
+                self.level,
+                format_fields(
+                    event=self.event,
+                    **self.context,
+                    status=status,
+                    **fields,
+                    skipped=self.skipped or None,
+                ),
+            )
+        self._status = status
+        self._logged_at = now
+        self.skipped = 0
+
+    def finish(self, status: str, **fields):
+        self.update(status, force=True, events=self.count + 1, **fields)
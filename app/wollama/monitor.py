@@ -0,0 +1,173 @@
+import asyncio
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, List, Optional
+
+from log2d import Log
+from ollama import AsyncClient
+from pydantic import BaseModel
+
+from wollama.logqueue import format_fields
+
+log = Log(Path(__file__).stem).logger
+LOG_LEVEL = "INFO"
+log.setLevel(level=f"{LOG_LEVEL}")
+
+
+class NodeSample(BaseModel):
+    """
+    One probe of an Ollama node.
+
+    Attributes:
+        time: float: When the probe started, seconds since the epoch.
+        up: bool: Whether the node answered.
+        latency_ms: float = None: How long the node took to answer.
+        loaded: List[str] = []: The models loaded into memory, e.g. ["llama3.2:1b"].
+        size: int = 0: The memory used by the loaded models in bytes.
+        size_vram: int = 0: The part of size which is in GPU memory.
+        error: str = None: Why the node did not answer.
+    """
+
+    time: float
+    up: bool
+    latency_ms: Optional[float] = None
+    loaded: List[str] = []
+    size: int = 0
+    size_vram: int = 0
+    error: Optional[str] = None
+
+
+class NodeMonitor:
+    """
+    Probes an Ollama node in the background and keeps the last samples in a ring
+    buffer, so that pages can show the node's health without ever waiting for it.
+
+    Every probe is a call to the ps API, which is cheap for Ollama, and tells the
+    latency, the loaded models and their memory use at once.
+
+    Attributes:
+        address: str: The address of the node, e.g. "http://localhost:11434".
+        aclient: AsyncClient = None: The client to probe with, created from address if None.
+        interval: float = 10: Seconds between probes.
+        history: int = 60: The number of samples kept.
+        timeout: float = 5: Seconds after which a probe counts as failed.
+        slow_ms: float = 1000: Latency above which the node counts as slow.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        aclient: AsyncClient = None,
+        interval: float = 10,
+        history: int = 60,
+        timeout: float = 5,
+        slow_ms: float = 1000,
+    ):
+        self.address = address
+        self.aclient = aclient if aclient is not None else AsyncClient(host=address)
+        self.interval = interval
+        self.timeout = timeout
+        self.slow_ms = slow_ms
+        self.samples: Deque[NodeSample] = deque(maxlen=history)
+
+    async def probe(self) -> NodeSample:
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(self.aclient.ps(), timeout=self.timeout)
+        except Exception as e:
+            sample = NodeSample(
+                time=started,
+                up=False,
+                error=f"{type(e).__name__}: {e}" if str(e) else type(e).__name__,
+            )
+        else:
+            models = response.models or []
+            sample = NodeSample(
+                time=started,
+                up=True,
+                latency_ms=(time.perf_counter() - start) * 1000,
+                loaded=[model.model or model.name or "" for model in models],
+                size=sum(model.size or 0 for model in models),
+                size_vram=sum(model.size_vram or 0 for model in models),
+            )
+        previous = self.status()
+        self.samples.append(sample)
+        if self.status() != previous:
+            log.info(
+                format_fields(
+                    event="node",
+                    address=self.address,
+                    status=self.status(),
+                    latency_ms=round(sample.latency_ms) if sample.up else None,
+                    error=sample.error,
+                )
+            )
+        return sample
+
+    async def run(self):
+        """
+        Probes the node every interval seconds until cancelled.
+        """
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+    @property
+    def latest(self) -> Optional[NodeSample]:
+        return self.samples[-1] if self.samples else None
+
+    def status(self) -> str:
+        """
+        Returns "unknown" before the first probe, then "down", "slow" or "up".
+        """
+        latest = self.latest
+        if latest is None:
+            return "unknown"
+        if not latest.up:
+            return "down"
+        if latest.latency_ms > self.slow_ms:
+            return "slow"
+        return "up"
+
+    def availability(self) -> Optional[float]:
+        """
+        Returns the share (0-1) of the kept samples in which the node answered.
+        """
+        if not self.samples:
+            return None
+        return sum(1 for sample in self.samples if sample.up) / len(self.samples)
+
+    def series(self, field: str) -> List[Optional[float]]:
+        """
+        Returns a field of every kept sample, oldest first, None where the node was down.
+        """
+        return [getattr(sample, field) if sample.up else None for sample in self.samples]
+
+    def sparkline(self, field: str, width: int = 120, height: int = 20) -> List[str]:
+        """
+        Returns a field's series as SVG polyline points, one string per run of
+        samples in which the node was up, scaled to width x height.
+        """
+        values = self.series(field)
+        known = [value for value in values if value is not None]
+        if not known:
+            return []
+        top = max(known) or 1
+        step = width / max(self.samples.maxlen - 1, 1)
+        # Right align, so the newest sample is always at the right edge.
+        offset = width - step * (len(values) - 1)
+        lines, points = [], []
+        for index, value in enumerate(values):
+            if value is None:
+                if points:
+                    lines.append(" ".join(points))
+                points = []
+                continue
+            x = offset + index * step
+            y = height - 1 - (height - 2) * value / top
+            points.append(f"{x:.1f},{y:.1f}")
+        if points:
+            lines.append(" ".join(points))
+        return lines
@@ -0,0 +1,91 @@
+"""
+Parsing of ollama.com library pages.
+
+The parse functions are module level and return plain tuples, so they can run
+in a process pool and send back little more than the extracted names and links.
+
+Usage:
+    pool = ProcessPoolExecutor(
+        2, mp_context=multiprocessing.get_context("spawn"), initializer=ignore_interrupts
+    )
+    tags = await loop.run_in_executor(pool, extract_tags, html, "llama3.2")
+    pool.shutdown()
+"""
+
+import signal
+from typing import List
+
+from wollama.profiling import span
+
+
+def extract_tags(html, model_name: str) -> List[tuple]:
+    """
+    Extracts the tags of a model from its ollama.com library page.
+
+    Args:
+        html (str | bytes): The library page of the model.
+        model_name (str): The name of the model, e.g. "llama3.2".
+
+    Returns:
+        List[tuple]: (name, link) for every tag, in page order.
+    """
+    from bs4 import BeautifulSoup
+    from yarl import URL
+
+    with span("parse_tags", model=model_name):
+        # Parse HTML with BeautifulSoup
+        # https://realpython.com/beautiful-soup-web-scraper-python/#step-3-parse-html-code-with-beautiful-soup
+        soup = BeautifulSoup(html, "html.parser")
+
+        # now get all the anchor tags
+        results = soup.find_all("a")
+
+        # now iterate and extract the model urls..
+        tags = []
+        for result in results:
+            # Save the tags.
+            if f"/library/{model_name}:" in result["href"]:
+                tag_url = URL(result["href"]).path
+                tags.append((tag_url.split(":")[-1], tag_url))
+
+        return tags
+
+
+def parse_model_list(html) -> List[tuple]:
+    """
+    Extracts the models listed on the ollama.com library page.
+
+    Args:
+        html (str | bytes): The library page.
+
+    Returns:
+        List[tuple]: (name, link, short description) for every model, in page order.
+    """
+    from bs4 import BeautifulSoup
+
+    with span("parse_model_list"):
+        soup = BeautifulSoup(html, "html.parser")
+
+        # Try to get the repo div...
+        results = soup.find(id="repo")
+        # Now try to get the list
+        results = results.find(role="list")
+
+        # now get all the anchor tags
+        results = results.find_all("a")
+
+        models = []
+        for result in results:
+            description_stub = result.find("p").text
+            link_stub = result["href"]
+            name_stub = link_stub.split("/")[-1]
+            models.append((name_stub, link_stub, description_stub))
+        return models
+
+
+def ignore_interrupts():
+    """
+    Initializer of the parse worker processes. Ctrl-C reaches the whole process
+    group, leave it to the app, which stops the pool.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
@@ -0,0 +1,251 @@
+import asyncio
+import collections
+import contextvars
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+# Global switch for timing spans. When disabled, spans are only recorded while a
+# request profile is active.
+enabled = False
+
+# Sampling interval of the stack sampler in seconds.
+sample_interval = 0.005
+
+_current_profile: contextvars.ContextVar = contextvars.ContextVar(
+    "wollama_profile", default=None
+)
+
+
+class Span(BaseModel):
+    """
+    A single timed section of work, e.g. "afetch_tags" or "render:library.html".
+    """
+
+    name: str
+    started: float
+    duration_ms: float
+    fields: Dict[str, str] = {}
+
+
+class Profile(BaseModel):
+    """
+    The result of profiling one request.
+
+    Attributes:
+        identifier: str: A unique identifier for the profile.
+        label: str: What was profiled, e.g. "GET /".
+        started: float: Unix timestamp at which profiling started.
+        duration_ms: float: Wall time of the request.
+        spans: List[Span]: Timing spans recorded while the request was in flight.
+        samples: int: The number of stack samples taken.
+        stacks: Dict[str, int]: Folded stacks ("outer;inner;leaf") and their sample counts.
+    """
+
+    identifier: str = ""
+    label: str = ""
+    started: float = 0.0
+    duration_ms: float = 0.0
+    spans: List[Span] = []
+    samples: int = 0
+    stacks: Dict[str, int] = {}
+
+    def top_functions(self, limit: int = 25) -> List[tuple]:
+        """
+        Returns the functions with the most samples at the top of the stack.
+        """
+        leaves = collections.Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+    def folded(self) -> str:
+        """
+        Returns the stacks in the folded format understood by flamegraph.pl and speedscope.
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.items())
+
+
+recent_spans: collections.deque = collections.deque(maxlen=500)
+recent_profiles: collections.deque = collections.deque(maxlen=20)
+
+
+@contextmanager
+def span(name: str, **fields):
+    """
+    Times the enclosed block.
+
+    The span is recorded when profiling is globally enabled or when the block runs
+    on behalf of a profiled request. Otherwise this is a no-op.
+    """
+    profile: Optional[Profile] = _current_profile.get()
+    if not enabled and profile is None:
+        yield
+        return
+    started = time.time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        new_span = Span(
+            name=name,
+            started=started,
+            duration_ms=(time.perf_counter() - start) * 1000,
+            fields={key: f"{value}" for key, value in fields.items()},
+        )
+        recent_spans.append(new_span)
+        if profile is not None:
+            profile.spans.append(new_span)
+
+
+class StackSampler:
+    """
+    Periodically samples the stack of one thread from a background thread.
+
+    Sampling keeps the overhead on the profiled thread low and bounded, unlike a
+    deterministic profiler which hooks every function call.
+
+    Attributes:
+        thread_id: int: The thread whose stack is sampled.
+        interval: float: Seconds between samples.
+        stacks: collections.Counter: Folded stacks and their sample counts.
+    """
+
+    def __init__(self, thread_id: int, interval: float = None):
+        self.thread_id = thread_id
+        self.interval = interval if interval else sample_interval
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="wollama-stack-sampler", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+
+class profile_request:
+    """
+    Context manager which profiles the enclosed block, usually one HTTP request.
+
+    The stack sampler watches the event loop thread, so work done for other
+    requests interleaved with the profiled one shows up in the samples too.
+
+    Usage:
+        async with profile_request("GET /") as profile:
+            ...
+    """
+
+    def __init__(self, label: str):
+        self.profile = Profile(identifier=str(uuid.uuid4()), label=label)
+        self._sampler = StackSampler(thread_id=threading.get_ident())
+        self._token = None
+        self._start = 0.0
+
+    async def __aenter__(self) -> Profile:
+        self.profile.started = time.time()
+        self._start = time.perf_counter()
+        self._token = _current_profile.set(self.profile)
+        self._sampler.start()
+        return self.profile
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._sampler.stop()
+        _current_profile.reset(self._token)
+        self.profile.duration_ms = (time.perf_counter() - self._start) * 1000
+        self.profile.samples = self._sampler.samples
+        self.profile.stacks = dict(self._sampler.stacks)
+        recent_profiles.append(self.profile)
+        return False
+
+
+def get_profile(identifier: str) -> Optional[Profile]:
+    for profile in recent_profiles:
+        if profile.identifier == identifier:
+            return profile
+    return None
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Returns the q-th percentile (0-100) of values using the nearest-rank method.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class LoopLagMonitor:
+    """
+    Measures event loop lag: how late a timer fires compared to when it was due.
+
+    Lag is the time every other coroutine has to wait behind blocking work on the
+    loop, e.g. HTML parsing or a big template render.
+
+    Attributes:
+        interval: float: Seconds between measurements.
+        samples: collections.deque: (timestamp, lag in ms) of the latest measurements.
+    """
+
+    def __init__(self, interval: float = 0.1, size: int = 3000):
+        self.interval = interval
+        self.samples: collections.deque = collections.deque(maxlen=size)
+        self._task = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - due) * 1000)
+            self.samples.append((time.time(), lag_ms))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def summary(self, since: float = 0.0) -> dict:
+        """
+        Returns lag percentiles in milliseconds for samples taken after since.
+        """
+        lags = [lag for timestamp, lag in self.samples if timestamp >= since]
+        return {
+            "count": len(lags),
+            "p50_ms": percentile(lags, 50),
+            "p99_ms": percentile(lags, 99),
+            "max_ms": max(lags) if lags else 0.0,
+        }
+
+
+loop_lag = LoopLagMonitor()
@@ -0,0 +1,269 @@
+import asyncio
+import random
+import time
+from typing import TYPE_CHECKING, Optional
+
+from pathlib import Path
+from log2d import Log
+
+if TYPE_CHECKING:
+    import aiohttp
+
+log = Log(Path(__file__).stem).logger
+LOG_LEVEL = "INFO"
+log.setLevel(level=f"{LOG_LEVEL}")
+
+
+class RegistryFetchError(Exception):
+    """
+    Raised when a registry page could not be fetched.
+    """
+
+
+class CircuitOpenError(RegistryFetchError):
+    """
+    Raised instead of issuing a request while the circuit breaker is open.
+    """
+
+
+class DeadlineExceededError(RegistryFetchError):
+    """
+    Raised when the overall deadline of a refresh ran out.
+    """
+
+
+class RetryPolicy:
+    """
+    Bounded retries with full-jitter exponential backoff.
+
+    Attributes:
+        attempts: int: The maximum number of attempts, including the first one.
+        base_delay: float: The backoff before the first retry in seconds.
+        max_delay: float: The upper bound of any backoff in seconds.
+    """
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Returns the seconds to wait before retry number attempt (starting at 0).
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class CircuitBreaker:
+    """
+    Stops issuing requests after repeated failures, e.g. while ollama.com is down.
+
+    The breaker opens after failure_threshold consecutive failures. After
+    reset_timeout seconds it lets a single trial request through (half-open);
+    success closes it again, failure re-opens it.
+
+    Attributes:
+        failure_threshold: int: Consecutive failures which open the breaker.
+        reset_timeout: float: Seconds the breaker stays open before a trial request.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                log.warning(f"Circuit breaker opened after {self.failures} failures.")
+            self.opened_at = time.monotonic()
+
+
+class Deadline:
+    """
+    An absolute point in time by which a piece of work must be finished.
+    """
+
+    def __init__(self, seconds: Optional[float]):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+
+def _is_transient(error: Exception) -> bool:
+    import aiohttp
+
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def record_validators(validators: Optional[dict], url: str, headers) -> None:
+    """
+    Stores the HTTP validators (ETag, Last-Modified) of a response in validators[url].
+    """
+    if validators is None:
+        return
+    entry = {
+        key: headers[header]
+        for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+        if header in headers
+    }
+    if entry:
+        validators[url] = entry
+
+
+async def _get_text(
+    session: "aiohttp.ClientSession", url: str, timeout: float, validators: dict = None
+) -> str:
+    import aiohttp
+
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        response.raise_for_status()
+        text = await response.text(encoding="utf-8")
+        record_validators(validators, url, response.headers)
+        return text
+
+
+async def _hedged_get_text(
+    session: "aiohttp.ClientSession",
+    url: str,
+    timeout: float,
+    hedge_after: float,
+    validators: dict = None,
+) -> str:
+    """
+    Issues a second, identical request if the first is slower than hedge_after
+    seconds and returns whichever succeeds first.
+    """
+    first = asyncio.ensure_future(_get_text(session, url, timeout, validators))
+    done, _ = await asyncio.wait({first}, timeout=hedge_after)
+    if done:
+        return first.result()
+    log.debug(f"Hedging slow request to {url}")
+    second = asyncio.ensure_future(_get_text(session, url, timeout, validators))
+    pending = {first, second}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def fetch_text(
+    session: "aiohttp.ClientSession",
+    url: str,
+    timeout: float = 10,
+    retry: RetryPolicy = None,
+    breaker: CircuitBreaker = None,
+    deadline: Deadline = None,
+    hedge_after: Optional[float] = None,
+    validators: Optional[dict] = None,
+) -> str:
+    """
+    Fetches a page with a per-request timeout, bounded retries and optional hedging.
+
+    Args:
+        session (aiohttp.ClientSession): The session to issue requests with.
+        url (str): The url of the page.
+        timeout (float): The timeout of a single request in seconds.
+        retry (RetryPolicy): Retries of transient failures, defaults to no retries.
+        breaker (CircuitBreaker): Shared breaker which short-circuits requests while open.
+        deadline (Deadline): Overall deadline, bounds the timeout and retries.
+        hedge_after (float): Issue a hedged request after this many seconds.
+        validators (dict): If given, the ETag and Last-Modified of the page are stored in validators[url].
+
+    Returns:
+        str: The body of the page.
+
+    Raises:
+        CircuitOpenError: If the breaker is open.
+        DeadlineExceededError: If the deadline ran out.
+        RegistryFetchError: If the page could not be fetched.
+    """
+    retry = retry if retry else RetryPolicy(attempts=1)
+    deadline = deadline if deadline else Deadline(None)
+    error = None
+    for attempt in range(retry.attempts):
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker is open, skipped {url}")
+        remaining = deadline.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceededError(f"Deadline exceeded before fetching {url}")
+        request_timeout = timeout if remaining is None else min(timeout, remaining)
+        try:
+            if hedge_after is not None and hedge_after < request_timeout:
+                text = await _hedged_get_text(
+                    session, url, request_timeout, hedge_after, validators
+                )
+            else:
+                text = await _get_text(session, url, request_timeout, validators)
+            if breaker is not None:
+                breaker.record_success()
+            return text
+        except Exception as e:
+            error = e
+            if not _is_transient(e):
+                # e.g. a 404, the registry answered so it is not down.
+                if breaker is not None:
+                    breaker.record_success()
+                break
+            if breaker is not None:
+                breaker.record_failure()
+            log.warning(
+                f"Attempt {attempt + 1} to fetch {url} failed: {type(e).__name__}: {e}"
+            )
+            if attempt + 1 < retry.attempts:
+                delay = retry.backoff(attempt)
+                remaining = deadline.remaining()
+                if remaining is not None and delay >= remaining:
+                    break
+                await asyncio.sleep(delay)
+    raise RegistryFetchError(
+        f"Could not fetch {url}: {type(error).__name__}: {error}"
+    ) from error
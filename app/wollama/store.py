@@ -0,0 +1,364 @@
+import asyncio
+import fcntl
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import MutableMapping
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple
+
+from log2d import Log
+
+log = Log(Path(__file__).stem).logger
+LOG_LEVEL = "INFO"
+log.setLevel(level=f"{LOG_LEVEL}")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    owner TEXT NOT NULL,
+    identifier TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (owner, identifier)
+);
+CREATE TABLE IF NOT EXISTS catalogs (
+    name TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    name TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (name, generation)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SharedStore:
+    """
+    State shared by all worker processes of the app, kept in a SQLite database.
+
+    Holds the jobs of OllamaManager and OllamaRegistry, their catalogs, the
+    catalog generation numbers and a bounded log of the changes of each
+    generation. File locks next to the database coordinate work which must
+    only run in one process at a time, e.g. a registry refresh.
+
+    Attributes:
+        path: str: The path of the SQLite database.
+        epoch: str: A random id of the database, generations of a recreated
+            database are not comparable with the old ones.
+    """
+
+    def __init__(self, path: str):
+        self.path = f"{path}"
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+            connection.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('epoch', ?)",
+                (uuid.uuid4().hex,),
+            )
+        self.epoch = self.get_meta("epoch")
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        yield connection
+
+    # Jobs
+
+    def get_job(self, owner: str, identifier: str) -> Optional[dict]:
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT data FROM jobs WHERE owner = ? AND identifier = ?",
+                (owner, identifier),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_job(self, owner: str, identifier: str, data: dict):
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO jobs (owner, identifier, data, updated) VALUES (?, ?, ?, ?)",
+                (owner, identifier, json.dumps(data, default=str), time.time()),
+            )
+
+    def delete_job(self, owner: str, identifier: str):
+        with self._connection() as connection:
+            connection.execute(
+                "DELETE FROM jobs WHERE owner = ? AND identifier = ?",
+                (owner, identifier),
+            )
+
+    def job_identifiers(self, owner: str) -> list:
+        with self._connection() as connection:
+            rows = connection.execute(
+                "SELECT identifier FROM jobs WHERE owner = ?", (owner,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # Catalogs
+
+    def catalog_generation(self, name: str) -> int:
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT generation FROM catalogs WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def load_catalog(self, name: str) -> Tuple[int, Any]:
+        """
+        Returns (generation, catalog) of the latest published catalog, (0, None) if there is none.
+        """
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT generation, data FROM catalogs WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            return 0, None
+        return row[0], pickle.loads(row[1])
+
+    def save_catalog(
+        self, name: str, catalog: Any, changes: Optional[list] = None, keep: int = 1000
+    ) -> int:
+        """
+        Publishes a catalog and returns its new generation number.
+
+        Args:
+            name (str): The name of the catalog.
+            catalog (Any): The catalog, pickled.
+            changes (list): JSON serializable changes since the previous generation,
+                None if they are unknown, which restarts the change log.
+            keep (int): The number of generations kept in the change log.
+
+        Returns:
+            int: The new generation number.
+        """
+        data = pickle.dumps(catalog)
+        with self._connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT generation FROM catalogs WHERE name = ?", (name,)
+                ).fetchone()
+                generation = (row[0] if row else 0) + 1
+                connection.execute(
+                    "INSERT OR REPLACE INTO catalogs (name, generation, data, updated) VALUES (?, ?, ?, ?)",
+                    (name, generation, data, time.time()),
+                )
+                if changes is None:
+                    connection.execute("DELETE FROM changes WHERE name = ?", (name,))
+                    floor = generation
+                else:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO changes (name, generation, data) VALUES (?, ?, ?)",
+                        (name, generation, json.dumps(changes)),
+                    )
+                    connection.execute(
+                        "DELETE FROM changes WHERE name = ? AND generation <= ?",
+                        (name, generation - keep),
+                    )
+                    floor = max(self._changes_floor(connection, name), generation - keep)
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    (f"changes-floor:{name}", f"{floor}"),
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return generation
+
+    def _changes_floor(self, connection: sqlite3.Connection, name: str) -> int:
+        row = connection.execute(
+            "SELECT value FROM meta WHERE key = ?", (f"changes-floor:{name}",)
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def load_changes(self, name: str, since: int) -> Optional[list]:
+        """
+        Returns the changes published after generation since, None if they are no longer kept.
+        """
+        with self._connection() as connection:
+            if since < self._changes_floor(connection, name):
+                return None
+            rows = connection.execute(
+                "SELECT generation, data FROM changes WHERE name = ? AND generation > ? ORDER BY generation",
+                (name, since),
+            ).fetchall()
+        return [
+            dict(change, generation=generation)
+            for generation, data in rows
+            for change in json.loads(data)
+        ]
+
+    # Meta
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT value FROM meta WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def delete_meta(self, key: str):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM meta WHERE key = ?", (key,))
+
+    # Cross-process locks
+
+    def try_lock(self, name: str) -> Optional["ProcessLock"]:
+        """
+        Returns a held ProcessLock, or None if another process (or task) holds it.
+        """
+        lock = ProcessLock(f"{self.path}.{name}.lock")
+        return lock if lock.acquire(blocking=False) else None
+
+    @contextmanager
+    def lock(self, name: str):
+        """
+        Holds the named cross-process lock for the duration of the block.
+        """
+        lock = ProcessLock(f"{self.path}.{name}.lock")
+        lock.acquire(blocking=True)
+        try:
+            yield lock
+        finally:
+            lock.release()
+
+    @asynccontextmanager
+    async def alock(self, name: str):
+        """
+        Like lock, but waits for the lock in a thread, so that a worker waiting
+        for another does not hold up its event loop.
+        """
+        lock = ProcessLock(f"{self.path}.{name}.lock")
+        await acquire_in_thread(lock)
+        try:
+            yield lock
+        finally:
+            lock.release()
+
+
+async def acquire_in_thread(lock):
+    """
+    Acquires a threading.Lock or a ProcessLock without blocking the event loop.
+
+    Takes the lock at once if it is free, otherwise waits for it in a thread. If
+    the waiting task is cancelled, the lock is released as soon as the thread
+    gets it.
+    """
+    if lock.acquire(blocking=False):
+        return
+    acquiring = asyncio.ensure_future(asyncio.to_thread(lock.acquire))
+    try:
+        await asyncio.shield(acquiring)
+    except asyncio.CancelledError:
+        acquiring.add_done_callback(
+            lambda future: future.cancelled() or future.exception() or lock.release()
+        )
+        raise
+
+
+class ProcessLock:
+    """
+    An advisory file lock (flock), exclusive across processes and open files.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class SharedJob(dict):
+    """
+    A job's info dict which writes every change through to the SharedStore.
+
+    Every change is a write, so set several keys with one update() call.
+    """
+
+    def __init__(self, store: SharedStore, owner: str, identifier: str, data: dict):
+        super().__init__(data)
+        self._store = store
+        self._owner = owner
+        self._identifier = identifier
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._store.put_job(self._owner, self._identifier, dict(self))
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._store.put_job(self._owner, self._identifier, dict(self))
+
+
+class SharedJobs(MutableMapping):
+    """
+    A drop-in replacement for the {"jobs": {}} dicts of OllamaManager and
+    OllamaRegistry, so that any worker can answer a status poll for any job.
+
+    Usage:
+        jobs = SharedJobs(store, owner="manager")
+        jobs[identifier] = {"status": "Starting"}
+        jobs[identifier]["status"] = "done"  # written through to the store
+        jobs[identifier].update(status="done", error=None)  # one write
+    """
+
+    def __init__(self, store: SharedStore, owner: str):
+        self.store = store
+        self.owner = owner
+
+    def __getitem__(self, identifier: str) -> SharedJob:
+        data = self.store.get_job(self.owner, identifier)
+        if data is None:
+            raise KeyError(identifier)
+        return SharedJob(self.store, self.owner, identifier, data)
+
+    def __setitem__(self, identifier: str, data: dict):
+        self.store.put_job(self.owner, identifier, dict(data))
+
+    def __delitem__(self, identifier: str):
+        self.store.delete_job(self.owner, identifier)
+
+    def __iter__(self):
+        return iter(self.store.job_identifiers(self.owner))
+
+    def __len__(self) -> int:
+        return len(self.store.job_identifiers(self.owner))
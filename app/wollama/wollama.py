@@ -1,13 +1,11 @@
 import time
 import os
-import requests
+import gzip
 import pickle
-from bs4 import BeautifulSoup
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Iterator, Optional
 import urllib.parse
 from pydantic import BaseModel
 from typing import List, Any
-from yarl import URL
 from ollama import Client, AsyncClient, ListResponse, StatusResponse
 from typing_extensions import TypedDict
 from pathlib import Path
@@ -16,8 +14,34 @@ import json
 import importlib_resources  # https://github.com/wimglenn/resources-example/tree/main
 from log2d import Log
 import asyncio
+import multiprocessing
+import threading
 import uuid
-import aiohttp
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from wollama.changes import Change, ChangeLog, added_model, diff_catalogs, diff_tags
+from wollama.enrich import DetailsCache, TagDetails, fetch_details
+from wollama.fleet import FleetDistributor, summarize
+from wollama.logqueue import ProgressLogger, format_fields
+from wollama.parsing import extract_tags, ignore_interrupts, parse_model_list
+from wollama.profiling import loop_lag, span
+from wollama.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Deadline,
+    DeadlineExceededError,
+    RegistryFetchError,
+    RetryPolicy,
+    fetch_text,
+    record_validators,
+)
+from wollama.store import SharedJobs, SharedStore, acquire_in_thread
+
+# The scraping stack (requests, bs4, aiohttp, yarl) is imported where it is used:
+# it is only needed to refresh the remote catalog, which a warm cache may make
+# unnecessary for the whole life of a worker. See benchmarks/importtime.py.
+if TYPE_CHECKING:
+    import aiohttp
 
 wollama_resource_dir = importlib_resources.files("wollama")
 wollama_cache_dir = wollama_resource_dir.joinpath("cache")
@@ -35,6 +59,13 @@ log.setLevel(level=f"{LOG_LEVEL}")
 
 mock_job_stack = {"jobs": {}}
 
+# Where OllamaRegistry.arefresh parses the pages it fetches, see OllamaRegistry.
+PARSE_WORKERS = ("inline", "thread", "process")
+
+# Seconds between writes of a pull's progress to its job, see OllamaManager._download.
+# A new status is written at once.
+JOB_PROGRESS_INTERVAL = 0.5
+
 
 async def mock_initiate_work(job_stack: dict, finish_code: str):
     identifier = str(uuid.uuid4())
@@ -61,6 +92,30 @@ async def mock_do_work(job_stack: dict, job_key: str):
     jobs[job_key]["status"] = "done"
 
 
+def build_tag_collection(tags: List[tuple]) -> "ModelTagCollection":
+    """
+    Builds a ModelTagCollection from the (name, link) tuples of extract_tags.
+    """
+    tag_collection = ModelTagCollection()
+    for name, link in tags:
+        tag_collection.tags[f"{name}"] = ModelTag(name=name, link=link)
+    return tag_collection
+
+
+def parse_tags(html, model_name: str) -> "ModelTagCollection":
+    """
+    Extracts the tags of a model from its ollama.com library page.
+
+    Args:
+        html (str | bytes): The library page of the model.
+        model_name (str): The name of the model, e.g. "llama3.2".
+
+    Returns:
+        ModelTagCollection
+    """
+    return build_tag_collection(extract_tags(html, model_name))
+
+
 # NOTE: Ollama doesn't expose this class like ListResponse but I wish they would!
 class OllamaInfo(BaseModel):
     """
@@ -69,12 +124,13 @@ class OllamaInfo(BaseModel):
 
     model: Any = None
     details: Any = None
+    tag_details: Optional[TagDetails] = None
 
 
 class ModelTag(BaseModel):
     name: str = ""
     link: str = ""
-    ollama_info: OllamaInfo = None
+    ollama_info: Optional[OllamaInfo] = None
 
 
 class ModelTagCollection(BaseModel):
@@ -106,14 +162,43 @@ class Catalog(BaseModel):
     |-Model
     |--Tag
 
+    Once published by an OllamaManager or OllamaRegistry, a catalog is an immutable
+    snapshot: it, its models and their tag collections are never changed in place.
+    Writers derive a new snapshot with with_model() or with_tag_collection(), which
+    share everything that did not change, and replace the reference to the old one.
+    Readers can therefore iterate a snapshot without locks, and caches can key on it.
+
     Attributes:
     models: Dict[str, CatalogLLM]: A dictionary of CatalogLLMs, e.g. {"llama3.2" : CatalogLLM(name="llama3.2"....)}
     object_version: str: A versioning identifier for the catalog schema.
+    generation: int: The generation of the snapshot, incremented whenever a changed catalog is published.
     """
 
     name: str = "ollama-catalog"
     models: Dict[str, CatalogLLM] = {}
     object_version: str = "0.0.0"
+    generation: int = 0
+
+    def with_model(self, model: CatalogLLM) -> "Catalog":
+        """
+        Returns a new snapshot in which model replaces the model of the same name.
+        """
+        return self.model_copy(update={"models": {**self.models, model.name: model}})
+
+    def with_tag_collection(
+        self, model_name: str, tag_collection: ModelTagCollection
+    ) -> "Catalog":
+        """
+        Returns a new snapshot in which the model model_name has the tags tag_collection.
+
+        The model is added if it is not in the catalog.
+        """
+        model = self.models.get(model_name)
+        if model is None:
+            model = CatalogLLM(name=model_name, tag_collection=tag_collection)
+        else:
+            model = model.model_copy(update={"tag_collection": tag_collection})
+        return self.with_model(model)
 
     def export_catalog(self, filepath: str):
         """
@@ -128,6 +213,47 @@ class Catalog(BaseModel):
         except Exception as e:
             log.error(e)
 
+    def iter_ndjson(self, per: str = "model") -> Iterator[str]:
+        """
+        Yields the catalog as newline delimited JSON, one compact record per line.
+
+        Args:
+            per (str): "model" for one record per model, including its tags, or
+                "tag" for one record per tag, e.g. {"model": "llama3.2", "name": "1b", ...}.
+
+        Raises:
+            ValueError: If per is neither "model" nor "tag".
+        """
+        if per not in ("model", "tag"):
+            raise ValueError(f"Cannot export one record per {per}")
+        # Iterate over a copy of the references so the catalog can change meanwhile.
+        for model in list(self.models.values()):
+            if per == "model":
+                yield model.model_dump_json() + "\n"
+                continue
+            for tag in list(model.tag_collection.tags.values()):
+                record = {"model": model.name, **tag.model_dump(mode="json")}
+                yield json.dumps(record, separators=(",", ":")) + "\n"
+
+    def export_ndjson(self, filepath: str, per: str = "model", compress: bool = False):
+        """
+        Exports the catalog as newline delimited JSON, written one record at a time.
+
+        Args:
+            filepath (str): The file to write, e.g. "catalog.ndjson.gz".
+            per (str): "model" or "tag", see iter_ndjson.
+            compress (bool): Write a gzip compressed file.
+        """
+        try:
+            opener = gzip.open if compress else open
+            with span("Catalog.export_ndjson", catalog=self.name), opener(
+                filepath, "wt", encoding="utf-8"
+            ) as file:
+                for line in self.iter_ndjson(per=per):
+                    file.write(line)
+        except Exception as e:
+            log.error(e)
+
     def save_to_cache(self, file_dir: str):
         """
         Exports a pickled Catalog object.
@@ -136,7 +262,9 @@ class Catalog(BaseModel):
         filepath = os.path.join(file_dir, cache_filename)
         try:
             # Open a file and use dump()
-            with open(filepath, "wb") as file:
+            with span("Catalog.save_to_cache", catalog=self.name), open(
+                filepath, "wb"
+            ) as file:
                 # A new file will be created
                 pickle.dump(self, file)
         except Exception as e:
@@ -150,7 +278,9 @@ class Catalog(BaseModel):
         filepath = os.path.join(f"{file_dir}", f"{cache_filename}")
         try:
             # Open a file and use dump()
-            with open(filepath, "rb") as file:
+            with span("Catalog.load_from_cache", catalog=self.name), open(
+                filepath, "rb"
+            ) as file:
                 # Call load method to deserialze
                 cached_catalog = pickle.load(file)
                 self.models = cached_catalog.models
@@ -159,20 +289,188 @@ class Catalog(BaseModel):
             raise e
 
 
-class OllamaManager:
+class SharedCatalog:
+    """
+    Tracks the generation and the changes of the catalog of an OllamaManager or
+    OllamaRegistry, and keeps the catalog in step with the other worker
+    processes through a SharedStore, if one is given.
+    """
+
+    store: Optional[SharedStore] = None
+    changes: ChangeLog
+    write_lock: threading.Lock
+
+    def sync_catalog(self) -> bool:
+        """
+        Adopts the catalog published by another worker if it is newer than ours.
+
+        Returns:
+            bool: True if the catalog was replaced.
+        """
+        if self.store is None:
+            return False
+        name = self.catalog.name
+        if self.store.catalog_generation(name) == self.catalog.generation:
+            return False
+        with span("SharedCatalog.sync_catalog", catalog=name):
+            generation, catalog = self.store.load_catalog(name)
+        if catalog is None:
+            return False
+        catalog.generation = generation
+        self.catalog = catalog
+        log.debug(f"Adopted {name} generation {generation}")
+        return True
+
+    def publish_catalog(
+        self, changes: Optional[List[Change]] = None, previous_generation: int = None
+    ):
+        """
+        Moves the catalog to a new generation and records its changes.
+
+        Args:
+            changes (List[Change]): The changes since the previous generation, None if
+                they are unknown, which restarts the change log.
+            previous_generation (int): The generation the changes were made to,
+                defaults to the generation of the catalog.
+        """
+        if previous_generation is None:
+            previous_generation = self.catalog.generation
+        if self.store is None:
+            generation = previous_generation + 1
+            self.changes.record(generation, changes)
+        else:
+            with span("SharedCatalog.publish_catalog", catalog=self.catalog.name):
+                generation = self.store.save_catalog(
+                    self.catalog.name,
+                    self.catalog,
+                    None
+                    if changes is None
+                    else [change.model_dump(mode="json") for change in changes],
+                    keep=self.changes.size,
+                )
+        for change in changes or []:
+            change.generation = generation
+        self.catalog = self.catalog.model_copy(update={"generation": generation})
+
+    @property
+    def epoch(self) -> str:
+        """
+        Identifies the history the generations belong to: the shared store's, or
+        this process' change log, whose generations start over with the process.
+        """
+        return self.store.epoch if self.store is not None else self.changes.epoch
+
+    def changes_since(self, generation: int) -> Optional[List[Change]]:
+        """
+        Returns the changes of the catalog after generation, None if they are no
+        longer in the change log and the whole catalog has to be fetched again.
+        """
+        if self.store is None:
+            return self.changes.since(generation)
+        changes = self.store.load_changes(self.catalog.name, generation)
+        return None if changes is None else [Change(**change) for change in changes]
+
+    @contextmanager
+    def shared_update(self):
+        """
+        Wraps a change of the catalog.
+
+        The block replaces self.catalog with a new snapshot and appends the
+        changes it made to the yielded list. If there are any, the catalog moves
+        to a new generation. Updates are serialized by write_lock, and with a
+        SharedStore also across workers: the latest published catalog is adopted
+        before the block runs and the changed catalog is published after it, so
+        no writer overwrites the change of another. Readers are never blocked.
+        Coroutines use ashared_update instead.
+
+        Usage:
+            with self.shared_update() as changes:
+                changes.extend(diff_catalogs(self.catalog, catalog))
+                self.catalog = catalog
+        """
+        changes = []
+        with self.write_lock:
+            if self.store is None:
+                previous_generation = self.catalog.generation
+                yield changes
+                self._finish_update(changes, previous_generation)
+                return
+            with self.store.lock(self.catalog.name):
+                self.sync_catalog()
+                previous_generation = self.catalog.generation
+                yield changes
+                self._finish_update(changes, previous_generation)
+
+    @asynccontextmanager
+    async def ashared_update(self):
+        """
+        Like shared_update, for coroutines: the locks are waited for in a thread,
+        so that waiting for another worker's update does not hold up the event loop.
+
+        Usage:
+            async with self.ashared_update() as changes:
+                changes.extend(diff_catalogs(self.catalog, catalog))
+                self.catalog = catalog
+        """
+        changes = []
+        await acquire_in_thread(self.write_lock)
+        try:
+            if self.store is None:
+                previous_generation = self.catalog.generation
+                yield changes
+                self._finish_update(changes, previous_generation)
+                return
+            async with self.store.alock(self.catalog.name):
+                self.sync_catalog()
+                previous_generation = self.catalog.generation
+                yield changes
+                self._finish_update(changes, previous_generation)
+        finally:
+            self.write_lock.release()
+
+    def _finish_update(self, changes: List[Change], previous_generation: int):
+        if changes:
+            self.publish_catalog(changes, previous_generation)
+        elif self.catalog.generation != previous_generation:
+            # The catalog may have been replaced by an identical one.
+            self.catalog = self.catalog.model_copy(
+                update={"generation": previous_generation}
+            )
+
+
+class OllamaManager(SharedCatalog):
     """
     A high level object for managing ollama models via an ollama python client.
 
     Attributes:
         catalog: Catalog: A catalog object representing ollama models and tags.
         ollama_client Client: The ollama python client.
+        store: SharedStore = None: Shares jobs and the catalog with other worker processes.
+        changes: ChangeLog: The changes of the last catalog generations.
+        fleet: FleetDistributor = None: Copies installed models to other Ollama nodes.
+        details_cache: DetailsCache = None: `ollama show` details by digest, None to not fetch them.
+        details_concurrency: int = 4: The maximum number of concurrent show() calls.
     """
 
-    def __init__(self, client: Client, aclient: AsyncClient):
+    def __init__(
+        self,
+        client: Client,
+        aclient: AsyncClient,
+        store: SharedStore = None,
+        fleet: FleetDistributor = None,
+        details_cache: DetailsCache = None,
+        details_concurrency: int = 4,
+    ):
         self.catalog = Catalog(name="local-ollama-catalog")
         self.ollama_client = client
         self.ollama_aclient = aclient
-        self.context = {"jobs": {}}
+        self.store = store
+        self.fleet = fleet
+        self.details_cache = details_cache
+        self.details_concurrency = details_concurrency
+        self.changes = ChangeLog()
+        self.write_lock = threading.Lock()
+        self.context = {"jobs": SharedJobs(store, owner="manager") if store else {}}
 
         # Ask Ollama for currently installed models and tags.
         result: ListResponse = client.list()
@@ -201,6 +499,12 @@ class OllamaManager:
                 )
                 self.catalog.models[name] = new_model
 
+        # Ollama is the source of truth for what is installed, so every worker
+        # publishes what it found on startup.
+        if self.store is not None:
+            with self.store.lock(self.catalog.name):
+                self.publish_catalog()
+
     def calling_back(self, message: str):
         log.info(message)
 
@@ -225,27 +529,59 @@ class OllamaManager:
         return identifier
 
     async def download(self, job_key, model: str, tag: str, finish_code: str):
-        jobs = self.context["jobs"]
+        await self._download(job_key, model=model, tag=tag, finish_code=finish_code)
+        self.context["jobs"][job_key]["status"] = "done"
+
+    async def _download(self, job_key, model: str, tag: str, finish_code: str) -> bool:
+        """
+        Pulls a model, reporting progress in the job's status.
+
+        Returns:
+            bool: True if Ollama reported the pull as successful.
+        """
+        job_info = self.context["jobs"][job_key]
+        progress = ProgressLogger(log, "pull", model=model, tag=tag, job=job_key)
+        succeeded = False
+        written = 0.0
+        written_status = None
         try:
             iter = 0
             async for part in await self.ollama_aclient.pull(
                 f"{model}:{tag}", stream=True
             ):
-                log.info(part)
+                progress.update(
+                    part.status,
+                    digest=part.digest,
+                    completed=part.completed,
+                    total=part.total,
+                )
                 iter += 1
-                job_info = jobs[job_key]
-                job_info["iteration"] = iter
-                job_info["status"] = f"{part}"
-                job_info["finish_code"] = finish_code
+                succeeded = part.status == "success"
+                # A pull sends many messages a second, write some of them to the job.
+                now = time.monotonic()
+                if (
+                    part.status != written_status
+                    or now - written >= JOB_PROGRESS_INTERVAL
+                ):
+                    job_info.update(
+                        iteration=iter, status=f"{part}", finish_code=finish_code
+                    )
+                    written, written_status = now, part.status
         except Exception as e:
-            log.error(e)
+            log.error(format_fields(event="pull", model=model, tag=tag, error=e))
 
-        self.add_to_catalog(model=model, tag=tag)
-        jobs[job_key]["status"] = "done"
+        await self.aadd_to_catalog(model=model, tag=tag)
+        progress.finish("done")
+        if succeeded:
+            await self.aenrich()
+        return succeeded
 
     async def download_wrap(self, model: str, tag: str):
         identifier = str(uuid.uuid4())
-        self.context["jobs"][identifier] = {}
+        self.context["jobs"][identifier] = {
+            "finish_code": f"{model}:{tag}",
+            "status": "Starting",
+        }
         asyncio.run_coroutine_threadsafe(
             self.download(
                 identifier, model=model, tag=tag, finish_code=f"{model}:{tag}"
@@ -254,59 +590,165 @@ class OllamaManager:
         )
         return identifier
 
+    async def aenrich(self) -> int:
+        """
+        Adds the details reported by `ollama show` to every installed tag.
+
+        Only tags whose digest is not in the details cache are queried, at most
+        details_concurrency at a time. With a SharedStore, one worker fetches
+        at a time and the others adopt its catalog.
+
+        Returns:
+            int: The number of tags whose details changed.
+        """
+        if self.details_cache is None:
+            return 0
+        enrich_lock = None
+        if self.store is not None:
+            enrich_lock = self.store.try_lock("enrich")
+            if enrich_lock is None:
+                log.info("Another worker is fetching model details, skipping.")
+                return 0
+        try:
+            listed: ListResponse = await self.ollama_aclient.list()
+            details = await fetch_details(
+                self.ollama_aclient,
+                {item.model: (item.digest, item.size) for item in listed.models},
+                self.details_cache,
+                concurrency=self.details_concurrency,
+            )
+            async with self.ashared_update() as changes:
+                for model in list(self.catalog.models.values()):
+                    old_tags = model.tag_collection.tags
+                    tags = {
+                        name: self._with_details(model.name, tag, details)
+                        for name, tag in old_tags.items()
+                    }
+                    tag_changes = diff_tags(model.name, old_tags, tags)
+                    if tag_changes:
+                        changes.extend(tag_changes)
+                        self.catalog = self.catalog.with_tag_collection(
+                            model.name, ModelTagCollection(tags=tags)
+                        )
+            return len(changes)
+        except Exception as e:
+            log.error(f"Could not fetch model details: {e}")
+            return 0
+        finally:
+            if enrich_lock is not None:
+                enrich_lock.release()
+
+    def _with_details(
+        self, model: str, tag: ModelTag, details: Dict[str, TagDetails]
+    ) -> ModelTag:
+        tag_details = details.get(f"{model}:{tag.name}")
+        info = tag.ollama_info if tag.ollama_info else OllamaInfo(model=f"{model}:{tag.name}")
+        if tag_details is None or info.tag_details == tag_details:
+            return tag
+        return tag.model_copy(
+            update={"ollama_info": info.model_copy(update={"tag_details": tag_details})}
+        )
+
+    def is_installed(self, model: str, tag: str) -> bool:
+        catalog_model = self.catalog.models.get(model)
+        return catalog_model is not None and tag in catalog_model.tag_collection.tags
+
+    async def distribute(self, job_key, model: str, tag: str, finish_code: str):
+        """
+        Copies a model to the nodes of the fleet, pulling it onto this node first
+        if it is not installed yet.
+        """
+        jobs = self.context["jobs"]
+        if not self.is_installed(model, tag) and not await self._download(
+            job_key, model=model, tag=tag, finish_code=finish_code
+        ):
+            jobs[job_key].update(
+                summary=f"Could not download {model}:{tag}", status="done"
+            )
+            return
+
+        summary = None
+
+        def report(state: Dict[str, dict]):
+            # Only write when the summary changes, not for every chunk sent.
+            nonlocal summary
+            if summarize(state) != summary:
+                summary = summarize(state)
+                jobs[job_key]["status"] = summary
+
+        try:
+            state = await self.fleet.distribute(model, tag, report=report)
+            result = {"nodes": state, "summary": summarize(state)}
+        except Exception as e:
+            log.error(format_fields(event="fleet", model=model, tag=tag, error=e))
+            result = {"summary": f"{e}"}
+        jobs[job_key].update(result, status="done")
+
+    async def distribute_wrap(self, model: str, tag: str):
+        identifier = str(uuid.uuid4())
+        self.context["jobs"][identifier] = {
+            "finish_code": f"{model}:{tag}",
+            "status": "Starting",
+        }
+        asyncio.run_coroutine_threadsafe(
+            self.distribute(
+                identifier, model=model, tag=tag, finish_code=f"{model}:{tag}"
+            ),
+            loop=asyncio.get_running_loop(),
+        )
+        return identifier
+
     def add_to_catalog(self, model: str, tag: str):
+        with self.shared_update() as changes:
+            changes.extend(self._add_to_catalog(model=model, tag=tag))
+
+    async def aadd_to_catalog(self, model: str, tag: str):
+        async with self.ashared_update() as changes:
+            changes.extend(self._add_to_catalog(model=model, tag=tag))
+
+    def _add_to_catalog(self, model: str, tag: str) -> List[Change]:
         try:
             new_model_tag = ModelTag(name=tag)
             if model in self.catalog.models.keys():
-                catalog_model = self.catalog.models[f"{model}"]
-                tag_collection = catalog_model.tag_collection
+                tag_collection = self.catalog.models[f"{model}"].tag_collection
                 if tag in tag_collection.tags.keys():
                     # tag was already in the library so do nothing.
                     pass
                 else:
-                    tag_collection.tags[f"{tag}"] = new_model_tag
+                    self.catalog = self.catalog.with_tag_collection(
+                        model,
+                        ModelTagCollection(tags={**tag_collection.tags, tag: new_model_tag}),
+                    )
+                    return diff_tags(model, {}, {tag: new_model_tag})
             else:
                 # new model in the catalog
-                new_tag_collection = ModelTagCollection()
-                new_tag_collection.tags[f"{tag}"] = new_model_tag
+                new_tag_collection = ModelTagCollection(tags={tag: new_model_tag})
                 new_model = CatalogLLM(name=model, tag_collection=new_tag_collection)
-                self.catalog.models[f"{model}"] = new_model
+                self.catalog = self.catalog.with_model(new_model)
+                return added_model(new_model)
         except Exception as e:
             log.error(e)
+        return []
 
     def pull(self, model: str, tag: str):
         try:
             response: StatusResponse = self.ollama_client.pull(
                 f"{model}:{tag}", stream=True
             )
+            progress = ProgressLogger(log, "pull", model=model, tag=tag)
             for message in response:
-                log.info(message)
+                progress.update(
+                    message.status,
+                    digest=message.digest,
+                    completed=message.completed,
+                    total=message.total,
+                )
 
         except Exception as e:
             log.error(e)
             log.error(message)
         if message.status == "success":
-            try:
-                new_model_tag = ModelTag(name=tag)
-                if model in self.catalog.models.keys():
-                    catalog_model = self.catalog.models[f"{model}"]
-                    tag_collection = catalog_model.tag_collection
-                    if tag in tag_collection.tags.keys():
-                        # tag was already in the library so do nothing.
-                        pass
-                    else:
-                        tag_collection.tags[f"{tag}"] = new_model_tag
-                else:
-                    # new model in the catalog
-                    new_tag_collection = ModelTagCollection()
-                    new_tag_collection.tags[f"{tag}"] = new_model_tag
-                    new_model = CatalogLLM(
-                        name=model, tag_collection=new_tag_collection
-                    )
-                    self.catalog.models[f"{model}"] = new_model
-            except Exception as e:
-                log.error(e)
-                log.error(response)
+            self.add_to_catalog(model=model, tag=tag)
         else:
             raise Exception(f"Could not download {model}:{tag}")
 
@@ -316,16 +758,20 @@ class OllamaManager:
         except Exception as e:
             log.error(e)
             log.error(response)
-        try:
-            model = self.catalog.models[f"{model}"]
-            tag_collection = model.tag_collection
-            tag_collection.tags.pop(f"{tag}")
-        except Exception as e:
-            log.error(e)
-            log.error(response)
+        with self.shared_update() as changes:
+            try:
+                tags = dict(self.catalog.models[f"{model}"].tag_collection.tags)
+                tags.pop(f"{tag}")
+                self.catalog = self.catalog.with_tag_collection(
+                    model, ModelTagCollection(tags=tags)
+                )
+                changes.append(Change(action="removed", model=model, tag=tag))
+            except Exception as e:
+                log.error(e)
+                log.error(response)
 
 
-class OllamaRegistry:
+class OllamaRegistry(SharedCatalog):
     """
     A high level object for representing ollama models available for download.
 
@@ -336,6 +782,21 @@ class OllamaRegistry:
         catalog: Catalog: A catalog object representing ollama models and tags.
         delay: int = 3: The delay in seconds which the object waits before issuing a request to the url.
         cache_dir: str = path/to/wollama/cache/:  The file directory at which the catalog is saved as a pickle.
+        timeout: float = 10: The timeout of a single page request in seconds.
+        refresh_deadline: float = None: The overall deadline of a refresh in seconds, None for no deadline.
+        retry: RetryPolicy: Retries with jittered backoff of transient page request failures.
+        hedge_after: float = None: Issue a hedged request for pages slower than this many seconds.
+        breaker: CircuitBreaker: Stops a refresh early while the registry is failing.
+        lazy: bool = False: Refresh only the library index, fetch the tags of a model when it is viewed.
+        tag_ttl: float = 86400: Seconds for which lazily fetched tags are considered fresh.
+        lazy_concurrency: int = 4: The maximum number of concurrent lazy tag fetches.
+        parse_workers: str = "inline": Where the async refresh parses pages: "inline" on
+            the event loop, or in a pool of parse_pool_size "thread"s or "process"es,
+            which keeps the loop responsive while a refresh runs.
+        parse_pool_size: int = 2: The number of parse workers.
+        store: SharedStore = None: Shares jobs and the catalog with other worker processes
+            and makes sure only one of them refreshes at a time.
+        changes: ChangeLog: The changes of the last catalog generations.
     """
 
     def __init__(
@@ -343,12 +804,48 @@ class OllamaRegistry:
         url: str = "https://ollama.com/library",
         delay: int = 3,
         cache_dir: str = wollama_cache_dir,
+        timeout: float = 10,
+        refresh_deadline: float = None,
+        retry: RetryPolicy = None,
+        hedge_after: float = None,
+        breaker: CircuitBreaker = None,
+        lazy: bool = False,
+        tag_ttl: float = 24 * 60 * 60,
+        lazy_concurrency: int = 4,
+        parse_workers: str = "inline",
+        parse_pool_size: int = 2,
+        store: SharedStore = None,
     ):
+        if parse_workers not in PARSE_WORKERS:
+            raise ValueError(
+                f"Unknown parse workers {parse_workers}, expected one of {PARSE_WORKERS}"
+            )
         self.url = url
         self.cache_dir = cache_dir
         self.catalog: Catalog = Catalog(name="remote-ollama-catalog")
         self.delay = delay
-        self.context = {"jobs": {}}
+        self.timeout = timeout
+        self.refresh_deadline = refresh_deadline
+        self.retry = retry if retry else RetryPolicy()
+        self.hedge_after = hedge_after
+        self.breaker = breaker if breaker else CircuitBreaker()
+        self.lazy = lazy
+        self.tag_ttl = tag_ttl
+        # Lazy mode: when the tags of each model were last fetched, and guards
+        # which make concurrent requests for the same model share one fetch.
+        self.tags_fetched_at: Dict[str, float] = {}
+        # The ETag / Last-Modified of every fetched page, by url.
+        self.validators: Dict[str, dict] = {}
+        self._tag_locks: Dict[str, asyncio.Lock] = {}
+        self._tag_fetches = asyncio.Semaphore(lazy_concurrency)
+        self.parse_workers = parse_workers
+        self.parse_pool_size = parse_pool_size
+        self._parse_pool = None
+        self._closed = False
+        self.store = store
+        self.changes = ChangeLog()
+        self.write_lock = threading.Lock()
+        self.context = {"jobs": SharedJobs(store, owner="registry") if store else {}}
         # if os.path.exists(cache_dir):
         #     try:
         #         print("Attempting to load catalog from cache")
@@ -365,18 +862,64 @@ class OllamaRegistry:
     def save_to_cache(self):
         catalog: Catalog = self.catalog
         try:
-            catalog.save_to_cache(file_dir=wollama_cache_dir)
+            catalog.save_to_cache(file_dir=self.cache_dir)
         except Exception as e:
             log.error(e)
 
     def load_from_cache(self):
-        # Open the file in binary mode
-        catalog: Catalog = self.catalog
+        # Load into a new snapshot, the current one may be being read.
+        catalog = Catalog(name=self.catalog.name, generation=self.catalog.generation)
         try:
-            catalog.load_from_cache(file_dir=wollama_cache_dir)
+            catalog.load_from_cache(file_dir=self.cache_dir)
         except Exception as e:
             log.error(e)
             raise e
+        self.catalog = catalog
+
+    def _parse_executor(self) -> Optional[Executor]:
+        """
+        Returns the parse worker pool, started on first use, None to parse inline.
+        """
+        if self.parse_workers == "inline":
+            return None
+        if self._closed:
+            raise RuntimeError("The parse workers were stopped")
+        if self._parse_pool is None:
+            if self.parse_workers == "process":
+                # Forking a process which runs threads (the event loop's executor,
+                # the log queue) can deadlock the child, and would hand it the
+                # server's sockets. Spawned workers start from a fresh interpreter.
+                self._parse_pool = ProcessPoolExecutor(
+                    self.parse_pool_size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=ignore_interrupts,
+                )
+            else:
+                self._parse_pool = ThreadPoolExecutor(
+                    self.parse_pool_size, thread_name_prefix="parse"
+                )
+        return self._parse_pool
+
+    async def _parse(self, parse, *args):
+        """
+        Runs a parse function in the parse workers, or inline.
+        """
+        executor = self._parse_executor()
+        if executor is None:
+            return parse(*args)
+        return await asyncio.get_running_loop().run_in_executor(executor, parse, *args)
+
+    def close(self):
+        """
+        Stops the parse workers, for good: a refresh still running fails to parse.
+
+        Waits for the parses in progress, so that the worker processes have
+        exited before the app server ends its own process.
+        """
+        self._closed = True
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=True, cancel_futures=True)
+            self._parse_pool = None
 
     async def do_work(self, job_key, files=None):
         iter_over = files if files else range(40)
@@ -390,42 +933,157 @@ class OllamaRegistry:
         self.calling_back(f"Howdy doody from: {job_key}")
 
     async def arefresh(self):
+        refresh_lock = None
+        if self.store is not None:
+            refresh_lock = self.store.try_lock("refresh")
+            if refresh_lock is None:
+                # Another worker is refreshing, report on its job instead.
+                running = self.store.get_meta("refresh-job")
+                if running is not None and running in self.context["jobs"]:
+                    log.info(f"Refresh {running} is already running in another worker.")
+                    return running
+                # Its job is not registered (yet), never crawl without the lock.
+                identifier = str(uuid.uuid4())
+                self.context["jobs"][identifier] = {
+                    "finish_code": "Finished refreshing the library!",
+                    "status": "done",
+                    "error": "A refresh is already running in another worker.",
+                }
+                log.info("Another worker is refreshing the library, skipping.")
+                return identifier
+
         identifier = str(uuid.uuid4())
         job_type = "refresh-library"
         self.context["jobs"][identifier] = {}
         self.context["jobs"][identifier]["finish_code"] = (
             "Finished refreshing the library!"
         )
+        if refresh_lock is not None:
+            self.store.set_meta("refresh-job", identifier)
 
         asyncio.run_coroutine_threadsafe(
-            self.afetch_model_list(url=self.url, job_id=identifier),
+            self._locked_refresh(identifier, refresh_lock),
             loop=asyncio.get_running_loop(),
         )
         # self.catalog = self.afetch_model_list(url=self.url)
         return identifier
         # self.save_to_cache()
 
+    async def _locked_refresh(self, identifier: str, refresh_lock=None):
+        try:
+            await self.afetch_model_list(
+                url=self.url, job_id=identifier, fetch_tags=not self.lazy
+            )
+        finally:
+            self._release_refresh(refresh_lock)
+
+    def _release_refresh(self, refresh_lock=None):
+        """
+        Unregisters the running refresh job, then releases the refresh lock.
+        """
+        if refresh_lock is not None:
+            self.store.delete_meta("refresh-job")
+            refresh_lock.release()
+
     def refresh(self):
-        self.catalog = self.fetch_model_list(url=self.url)
-        self.save_to_cache()
+        refresh_lock = None
+        if self.store is not None:
+            refresh_lock = self.store.try_lock("refresh")
+            if refresh_lock is None:
+                log.info("Another worker is refreshing the library, skipping.")
+                return
+            # Register a job, so that other workers report on it instead of crawling.
+            identifier = str(uuid.uuid4())
+            self.context["jobs"][identifier] = {
+                "finish_code": "Finished refreshing the library!",
+                "status": "Refreshing the library...",
+            }
+            self.store.set_meta("refresh-job", identifier)
+        try:
+            catalog = self.fetch_model_list(url=self.url, fetch_tags=not self.lazy)
+            if catalog is not None:
+                with self.shared_update() as changes:
+                    changes.extend(diff_catalogs(self.catalog, catalog))
+                    self.catalog = catalog
+                self.save_to_cache()
+        finally:
+            if refresh_lock is not None:
+                self.context["jobs"][identifier]["status"] = "done"
+            self._release_refresh(refresh_lock)
+
+    def tags_fresh(self, model_name: str) -> bool:
+        """
+        Returns True if the tags of the model were fetched within the tag TTL.
+        """
+        fetched_at = self.tags_fetched_at.get(model_name)
+        return fetched_at is not None and time.time() - fetched_at < self.tag_ttl
+
+    async def aget_tags(self, model_name: str) -> ModelTagCollection:
+        """
+        Returns the tags of a model, fetching them if they are older than the tag TTL.
+
+        Concurrent calls for the same model wait for a single fetch. When the fetch
+        fails, the tags already in the catalog are returned.
+
+        Raises:
+            KeyError: If the model is not in the catalog.
+        """
+        model = self.catalog.models[model_name]
+        if self.tags_fresh(model_name):
+            return model.tag_collection
+        lock = self._tag_locks.setdefault(model_name, asyncio.Lock())
+        async with lock:
+            # Another request may have fetched the tags while we waited.
+            model = self.catalog.models[model_name]
+            if self.tags_fresh(model_name):
+                return model.tag_collection
+            try:
+                async with self._tag_fetches:
+                    tag_collection = await self.afetch_tags(
+                        model_name=model_name, delay=0
+                    )
+            except Exception as e:
+                log.error(f"Trouble pulling tags for {model_name}: {e}")
+                return model.tag_collection
+            async with self.ashared_update() as changes:
+                # Adopting another worker's catalog may have replaced the model.
+                model = self.catalog.models.get(model_name, model)
+                changes.extend(
+                    diff_tags(model_name, model.tag_collection.tags, tag_collection.tags)
+                )
+                self.catalog = self.catalog.with_tag_collection(model_name, tag_collection)
+            self.tags_fetched_at[model_name] = time.time()
+            return tag_collection
 
     async def afetch_tags(
-        self, model_name: str = None, timeout: int = 10
+        self,
+        model_name: str = None,
+        timeout: float = None,
+        session: "aiohttp.ClientSession" = None,
+        deadline: Deadline = None,
+        delay: float = None,
     ) -> ModelTagCollection:
         """
         Fetches the model tags from the remote model library.
 
         Args:
-            url (str): The URL of the website to fetch, defaults to https://ollama.com/library
-            timeout (int): Request timeout in seconds (default: 10)
+            model_name (str): The name of the model, e.g. "llama3.2".
+            timeout (float): Per-request timeout in seconds, defaults to the registry's timeout.
+            session (aiohttp.ClientSession): Session to reuse, a new one is opened if None.
+            deadline (Deadline): Overall deadline of the refresh this fetch belongs to.
+            delay (float): Seconds to wait before the request, defaults to the registry's delay.
 
         Returns:
             ModelTagCollection
 
         Raises:
             ValueError: If URL is invalid or empty
+            RegistryFetchError: If the page could not be fetched
         """
 
+        import aiohttp
+        from yarl import URL
+
         # Creating a URL
         yarl_url = URL(f"{self.url}")
         log.debug(yarl_url.host)  # 'example.com'
@@ -450,42 +1108,34 @@ class OllamaRegistry:
         except Exception:
             raise ValueError("Invalid URL format")
 
-        try:
-            # Fetch the website
-            await asyncio.sleep(self.delay)
-            # response = requests.get(url, timeout=timeout)
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{url}") as response:
-                    response.raise_for_status()
-                    text = await response.text(encoding="utf-8")
-                    # Parse HTML with BeautifulSoup
-                    soup = BeautifulSoup(text, "html.parser")
-                    # https://realpython.com/beautiful-soup-web-scraper-python/#step-3-parse-html-code-with-beautiful-soup
-                    # Note: You’ll want to pass .content instead of .text to avoid problems with character encoding. The .content attribute holds raw bytes, which Python’s built-in HTML parser can decode better than the text representation you printed earlier using the .text attribute.
-
-            # now get all the anchor tags
-            results = soup.find_all("a")
+        # Fetch the website
+        await asyncio.sleep(self.delay if delay is None else delay)
+        with span("afetch_tags", model=model_name):
+            if session is None:
+                async with aiohttp.ClientSession() as session:
+                    text = await self._afetch_page(session, url, timeout, deadline)
+            else:
+                text = await self._afetch_page(session, url, timeout, deadline)
 
-            # now iterate and extract the model urls..
-            tag_collection = ModelTagCollection()
-            for result in results:
-                # Save the tags.
-                if f"/library/{model_name}:" in result["href"]:
-                    new_tag = ModelTag()
-                    tag_url = URL(result["href"]).path
-                    result = tag_url.split(":")[-1]
-                    new_tag.name = result
-                    new_tag.link = tag_url
-                    tag_collection.tags[f"{new_tag.name}"] = new_tag
+            return build_tag_collection(await self._parse(extract_tags, text, model_name))
 
-            return tag_collection
-
-        except requests.exceptions.RequestException as e:
-            log.error(f"Error fetching website: {str(e)}")
-            return ModelTagCollection()
-        except Exception as e:
-            log.error(f"Unexpected error: {str(e)}")
-            return ModelTagCollection()
+    async def _afetch_page(
+        self,
+        session: "aiohttp.ClientSession",
+        url: str,
+        timeout: float = None,
+        deadline: Deadline = None,
+    ) -> str:
+        return await fetch_text(
+            session,
+            url,
+            timeout=timeout if timeout else self.timeout,
+            retry=self.retry,
+            breaker=self.breaker,
+            deadline=deadline,
+            hedge_after=self.hedge_after,
+            validators=self.validators,
+        )
 
     def fetch_tags(
         self, model_name: str = None, timeout: int = 10
@@ -504,6 +1154,9 @@ class OllamaRegistry:
             ValueError: If URL is invalid or empty
         """
 
+        import requests
+        from yarl import URL
+
         # Creating a URL
         yarl_url = URL(f"{self.url}")
         log.debug(yarl_url.host)  # 'example.com'
@@ -534,28 +1187,9 @@ class OllamaRegistry:
             time.sleep(self.delay)
             response = requests.get(url, timeout=timeout)
             response.raise_for_status()  # Raise exception for bad status codes
+            record_validators(self.validators, url, response.headers)
 
-            # Parse HTML with BeautifulSoup
-            soup = BeautifulSoup(response.content, "html.parser")
-            # https://realpython.com/beautiful-soup-web-scraper-python/#step-3-parse-html-code-with-beautiful-soup
-            # Note: You’ll want to pass .content instead of .text to avoid problems with character encoding. The .content attribute holds raw bytes, which Python’s built-in HTML parser can decode better than the text representation you printed earlier using the .text attribute.
-
-            # now get all the anchor tags
-            results = soup.find_all("a")
-
-            # now iterate and extract the model urls..
-            tag_collection = ModelTagCollection()
-            for result in results:
-                # Save the tags.
-                if f"/library/{model_name}:" in result["href"]:
-                    new_tag = ModelTag()
-                    tag_url = URL(result["href"]).path
-                    result = tag_url.split(":")[-1]
-                    new_tag.name = result
-                    new_tag.link = tag_url
-                    tag_collection.tags[f"{new_tag.name}"] = new_tag
-
-            return tag_collection
+            return parse_tags(response.content, model_name=model_name)
 
         except requests.exceptions.RequestException as e:
             log.error(f"Error fetching website: {str(e)}")
@@ -565,14 +1199,22 @@ class OllamaRegistry:
             return None
 
     async def afetch_model_list(
-        self, url: str, job_id: str, timeout: int = 10
+        self, url: str, job_id: str, timeout: float = None, fetch_tags: bool = True
     ) -> Catalog:
         """
         Fetches the model cards from the remote model library.
 
+        Models whose tags cannot be fetched keep their tags from the previous
+        catalog. The refresh stops early, keeping the previous entries of all
+        remaining models, when the circuit breaker opens or the refresh deadline
+        runs out.
+
         Args:
             url (str): The URL of the website to fetch, defaults to https://ollama.com/library
-            timeout (int): Request timeout in seconds (default: 10)
+            job_id (str): The identifier of the refresh job to report progress to.
+            timeout (float): Per-request timeout in seconds, defaults to the registry's timeout.
+            fetch_tags (bool): If False, only the library index is fetched and every
+                model keeps its previous tags until they are fetched lazily.
 
         Returns:
             Catalog
@@ -580,6 +1222,8 @@ class OllamaRegistry:
         Raises:
             ValueError: If URL is invalid or empty
         """
+        import aiohttp
+
         jobs = self.context["jobs"]
         job_info = jobs[job_id]
         job_info["status"] = "Preparing to fetch model and tag metadata..."
@@ -599,73 +1243,100 @@ class OllamaRegistry:
         except Exception:
             raise ValueError("Invalid URL format")
 
+        previous = self.catalog
+        deadline = Deadline(self.refresh_deadline)
+        started = time.time()
         try:
-            # Fetch the website
-            # response = requests.get(url, headers=headers, timeout=timeout)
-            await asyncio.sleep(self.delay)
-            # response = requests.get(url, timeout=timeout)
             async with aiohttp.ClientSession() as session:
-                async with session.get(f"{url}") as response:
-                    response.raise_for_status()
-                    text = await response.text(encoding="utf-8")
-                    # Raise exception for bad status codes
-                    # Parse HTML with BeautifulSoup
-                    soup = BeautifulSoup(text, "html.parser")
-                    # https://realpython.com/beautiful-soup-web-scraper-python/#step-3-parse-html-code-with-beautiful-soup
-                    # Note: You’ll want to pass .content instead of .text to avoid problems with character encoding. The .content attribute holds raw bytes, which Python’s built-in HTML parser can decode better than the text representation you printed earlier using the .text attribute.
-
-            # Try to get the repo div...
-            results = soup.find(id="repo")
-            # Now try to get the list
-            results = results.find(role="list")
-
-            # now get all the anchor tags
-            results = results.find_all("a")
-
-            # now iterate and extract the model urls..
-            catalog = Catalog()
-            models = catalog.models
-            for result in results:
-                # Save the tags.
-                description_stub = result.find("p").text
-                link_stub = result["href"]
-                name_stub = link_stub.split("/")[-1]
-                try:
-                    tag_collection = await self.afetch_tags(model_name=name_stub)
-                except Exception as e:
-                    log.error(f"Trouble pulling tags for {name_stub}")
-                    log.error(f"{e}")
-                    tag_collection = ModelTagCollection()
-                new_model = CatalogLLM(
-                    name=name_stub,
-                    link=f"{url_parse.scheme}://{url_parse.netloc}{link_stub}",
-                    short_description=f"{description_stub}",
-                    tag_collection=tag_collection,
+                # Fetch the website
+                await asyncio.sleep(self.delay)
+                text = await self._afetch_page(session, url, timeout, deadline)
+
+                # now iterate and extract the model urls..
+                catalog = Catalog(name=previous.name)
+                models = catalog.models
+                kept = []
+                stopped = None
+                progress = ProgressLogger(log, "refresh", job=job_id)
+                for name_stub, link_stub, description_stub in await self._parse(
+                    parse_model_list, text
+                ):
+                    previous_model = previous.models.get(name_stub)
+                    tag_collection = None
+                    if fetch_tags and stopped is None:
+                        try:
+                            tag_collection = await self.afetch_tags(
+                                model_name=name_stub,
+                                timeout=timeout,
+                                session=session,
+                                deadline=deadline,
+                            )
+                        except (CircuitOpenError, DeadlineExceededError) as e:
+                            stopped = e
+                            log.error(f"Stopping the refresh early: {e}")
+                        except Exception as e:
+                            log.error(f"Trouble pulling tags for {name_stub}")
+                            log.error(f"{e}")
+                    if tag_collection is None:
+                        # Keep what we knew rather than wiping the tags.
+                        if fetch_tags:
+                            kept.append(name_stub)
+                        tag_collection = (
+                            previous_model.tag_collection
+                            if previous_model
+                            else ModelTagCollection()
+                        )
+                    else:
+                        self.tags_fetched_at[name_stub] = time.time()
+                    new_model = CatalogLLM(
+                        name=name_stub,
+                        link=f"{url_parse.scheme}://{url_parse.netloc}{link_stub}",
+                        short_description=f"{description_stub}",
+                        tag_collection=tag_collection,
+                    )
+                    models[f"{new_model.name}"] = new_model
+                    job_info.update(
+                        iteration="Null", status=f"Retrieved {name_stub} metadata..."
+                    )
+                    progress.update("fetching", model=name_stub, models=len(models))
+            if kept:
+                log.warning(
+                    f"Kept the previous tags of {len(kept)} models which could not be refreshed."
                 )
-                models[f"{new_model.name}"] = new_model
-                job_info["iteration"] = "Null"
-                status = f"Retrieved {name_stub} metadata..."
-                job_info["status"] = status
-                log.info(f"{status}")
-            job_info["status"] = "done"
-            self.catalog = catalog
+            async with self.ashared_update() as changes:
+                changes.extend(diff_catalogs(self.catalog, catalog))
+                self.catalog = catalog
             self.save_to_cache()
+            # How long other requests waited behind the refresh, if lag is measured.
+            lag = loop_lag.summary(since=started)
+            job_info.update(kept=len(kept), loop_lag=lag, status="done")
+            progress.finish(
+                "done",
+                models=len(models),
+                kept=len(kept),
+                changes=len(changes),
+                parse_workers=self.parse_workers,
+                loop_lag_p99_ms=round(lag["p99_ms"], 1) if lag["count"] else None,
+                loop_lag_max_ms=round(lag["max_ms"], 1) if lag["count"] else None,
+            )
             return catalog
 
-        except requests.exceptions.RequestException as e:
-            log.error(f"Error fetching website: {str(e)}")
-            return self.catalog
         except Exception as e:
-            log.error(f"Unexpected error: {str(e)}")
+            log.error(f"Could not refresh the library, keeping the previous catalog: {e}")
+            job_info.update(error=f"{e}", status="done")
             return self.catalog
 
-    def fetch_model_list(self, url: str, timeout: int = 10) -> Catalog:
+    def fetch_model_list(
+        self, url: str, timeout: int = 10, fetch_tags: bool = True
+    ) -> Catalog:
         """
         Fetches the model cards from the remote model library.
 
         Args:
             url (str): The URL of the website to fetch, defaults to https://ollama.com/library
             timeout (int): Request timeout in seconds (default: 10)
+            fetch_tags (bool): If False, only the library index is fetched and every
+                model keeps its previous tags.
 
         Returns:
             Catalog
@@ -673,6 +1344,8 @@ class OllamaRegistry:
         Raises:
             ValueError: If URL is invalid or empty
         """
+        import requests
+
         # Input validation
         if not url or not isinstance(url, str):
             raise ValueError("URL must be a non-empty string")
@@ -695,29 +1368,21 @@ class OllamaRegistry:
             time.sleep(self.delay)
             response = requests.get(url, timeout=timeout)
             response.raise_for_status()  # Raise exception for bad status codes
-
-            # Parse HTML with BeautifulSoup
-            soup = BeautifulSoup(response.content, "html.parser")
-            # https://realpython.com/beautiful-soup-web-scraper-python/#step-3-parse-html-code-with-beautiful-soup
-            # Note: You’ll want to pass .content instead of .text to avoid problems with character encoding. The .content attribute holds raw bytes, which Python’s built-in HTML parser can decode better than the text representation you printed earlier using the .text attribute.
-
-            # Try to get the repo div...
-            results = soup.find(id="repo")
-            # Now try to get the list
-            results = results.find(role="list")
-
-            # now get all the anchor tags
-            results = results.find_all("a")
+            record_validators(self.validators, url, response.headers)
 
             # now iterate and extract the model urls..
-            catalog = Catalog()
+            catalog = Catalog(name=self.catalog.name)
             models = catalog.models
-            for result in results:
-                # Save the tags.
-                description_stub = result.find("p").text
-                link_stub = result["href"]
-                name_stub = link_stub.split("/")[-1]
-                tag_collection = self.fetch_tags(model_name=name_stub)
+            for name_stub, link_stub, description_stub in parse_model_list(
+                response.content
+            ):
+                previous_model = self.catalog.models.get(name_stub)
+                if fetch_tags:
+                    tag_collection = self.fetch_tags(model_name=name_stub)
+                elif previous_model:
+                    tag_collection = previous_model.tag_collection
+                else:
+                    tag_collection = ModelTagCollection()
                 new_model = CatalogLLM(
                     name=name_stub,
                     link=f"{url_parse.scheme}://{url_parse.netloc}{link_stub}",
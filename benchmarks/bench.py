@@ -0,0 +1,269 @@
+"""
+Offline micro-benchmarks for the wollama package.
+
+Usage:
+    python benchmarks/bench.py                      # run everything
+    python benchmarks/bench.py --filter render      # only benchmarks matching "render"
+    python benchmarks/bench.py --sizes 100 1000     # skip the 10k catalog
+
+Results are written as JSON to benchmarks/results/<commit>.json and can be
+compared between commits with benchmarks/compare.py.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from catalogs import (
+    APP_DIR,
+    BENCHMARK_DIR,
+    OfflineClient,
+    catalog_from_records,
+    fixture,
+    installed_models,
+    synthetic_catalog,
+    synthetic_records,
+)
+from assets import AssetManifest
+from jinja2 import Environment, FileSystemLoader
+from wollama.compact import CompactCatalog
+from wollama.wollama import (
+    Catalog,
+    OllamaManager,
+    parse_model_list,
+    parse_tags,
+)
+
+DEFAULT_SIZES = [100, 1000, 10000]
+
+BENCHMARKS = []
+
+
+def benchmark(name: str, sized: bool = False, memory: bool = False):
+    """
+    Registers a benchmark.
+
+    The decorated function does any setup and returns a zero argument callable,
+    which is the code that gets timed. Sized benchmarks receive the number of
+    models in the synthetic catalog. Memory benchmarks measure the bytes retained
+    by the object the callable returns instead of timing it.
+    """
+
+    def decorator(func):
+        BENCHMARKS.append((name, sized, memory, func))
+        return func
+
+    return decorator
+
+
+def library_template():
+    environment = Environment(loader=FileSystemLoader(f"{APP_DIR / 'templates'}"))
+    environment.globals["asset_url"] = AssetManifest()
+    return environment.get_template("library.html")
+
+
+@benchmark("parse_tags")
+def bench_parse_tags(size=None):
+    html = fixture("library-llama3.2.html")
+    return lambda: parse_tags(html, model_name="llama3.2")
+
+
+@benchmark("parse_model_list")
+def bench_parse_model_list(size=None):
+    html = fixture("library.html")
+    return lambda: parse_model_list(html)
+
+
+@benchmark("catalog_construction", sized=True)
+def bench_catalog_construction(size):
+    records = synthetic_records(size)
+    return lambda: catalog_from_records(records)
+
+
+@benchmark("compact_catalog_construction", sized=True)
+def bench_compact_catalog_construction(size):
+    records = synthetic_records(size)
+    return lambda: CompactCatalog.from_records(records)
+
+
+@benchmark("catalog_memory", sized=True, memory=True)
+def bench_catalog_memory(size):
+    records = synthetic_records(size)
+    return lambda: catalog_from_records(records)
+
+
+@benchmark("compact_catalog_memory", sized=True, memory=True)
+def bench_compact_catalog_memory(size):
+    records = synthetic_records(size)
+    return lambda: CompactCatalog.from_records(records)
+
+
+@benchmark("save_to_cache", sized=True)
+def bench_save_to_cache(size):
+    catalog = synthetic_catalog(size)
+    cache_dir = tempfile.mkdtemp(prefix="wollama-bench-")
+    return lambda: catalog.save_to_cache(file_dir=cache_dir)
+
+
+@benchmark("load_from_cache", sized=True)
+def bench_load_from_cache(size):
+    catalog = synthetic_catalog(size)
+    cache_dir = tempfile.mkdtemp(prefix="wollama-bench-")
+    catalog.save_to_cache(file_dir=cache_dir)
+    return lambda: Catalog(name=catalog.name).load_from_cache(file_dir=cache_dir)
+
+
+@benchmark("export_ndjson", sized=True)
+def bench_export_ndjson(size):
+    catalog = synthetic_catalog(size)
+    cache_dir = tempfile.mkdtemp(prefix="wollama-bench-")
+    return lambda: catalog.export_ndjson(f"{cache_dir}/catalog.ndjson.gz", compress=True)
+
+
+@benchmark("add_to_catalog_and_delete", sized=True)
+def bench_add_to_catalog_and_delete(size):
+    remote = synthetic_catalog(size)
+    manager = OllamaManager(
+        client=OfflineClient(installed=installed_models(remote)), aclient=None
+    )
+    model_names = list(remote.models)[:100]
+
+    def run():
+        for model_name in model_names:
+            manager.add_to_catalog(model=model_name, tag="bench")
+        for model_name in model_names:
+            manager.delete(model=model_name, tag="bench")
+
+    return run
+
+
+@benchmark("render_library", sized=True)
+def bench_render_library(size):
+    remote = synthetic_catalog(size)
+    local = OllamaManager(
+        client=OfflineClient(installed=installed_models(remote)), aclient=None
+    ).catalog
+    template = library_template()
+    return lambda: template.render(
+        remote=remote, local=local, ollama_address="http://localhost:11434"
+    )
+
+
+@benchmark("render_library_compact", sized=True)
+def bench_render_library_compact(size):
+    remote = CompactCatalog.from_records(synthetic_records(size))
+    local = OllamaManager(
+        client=OfflineClient(installed=installed_models(remote)), aclient=None
+    ).catalog
+    template = library_template()
+    return lambda: template.render(
+        remote=remote, local=local, ollama_address="http://localhost:11434"
+    )
+
+
+def measure(func, repeat: int) -> dict:
+    # Warm up caches, e.g. the jinja template cache, before timing.
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        "repeat": repeat,
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "mean_s": statistics.fmean(timings),
+        "stdev_s": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def measure_memory(func) -> dict:
+    """
+    Measures the bytes allocated and still referenced by the result of func.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = func()
+        after = tracemalloc.take_snapshot()
+        retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"retained_bytes": retained, "peak_bytes": peak}
+
+
+def git(*args) -> str:
+    try:
+        return subprocess.run(
+            ["git", *args],
+            cwd=BENCHMARK_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def metadata() -> dict:
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="Only run matching benchmarks.")
+    parser.add_argument("--output", default=None, help="Path of the JSON results.")
+    args = parser.parse_args(argv)
+
+    meta = metadata()
+    results = {}
+    for name, sized, memory, func in BENCHMARKS:
+        for size in args.sizes if sized else [None]:
+            key = f"{name}[{size}]" if sized else name
+            if args.filter not in key:
+                continue
+            if memory:
+                result = measure_memory(func(size))
+                print(
+                    f"{key:<40} retained {result['retained_bytes'] / 1e6:8.2f} MB"
+                    f"   peak {result['peak_bytes'] / 1e6:8.2f} MB"
+                )
+            else:
+                result = measure(func(size), repeat=args.repeat)
+                print(
+                    f"{key:<40} median {result['median_s'] * 1000:10.3f} ms"
+                    f"   min {result['min_s'] * 1000:10.3f} ms"
+                )
+            results[key] = result
+
+    output = args.output
+    if output is None:
+        results_dir = BENCHMARK_DIR / "results"
+        results_dir.mkdir(exist_ok=True)
+        output = results_dir / f"{meta['commit'][:12] or 'unknown'}.json"
+    with open(output, "w") as file:
+        json.dump({"meta": meta, "results": results}, file, indent=2)
+    print(f"Wrote {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
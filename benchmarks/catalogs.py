@@ -0,0 +1,115 @@
+"""
+Synthetic catalogs and offline stand-ins used by the benchmark suite.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCHMARK_DIR.parent / "app"
+FIXTURE_DIR = BENCHMARK_DIR / "fixtures"
+
+# The application imports wollama relative to the app directory.
+if f"{APP_DIR}" not in sys.path:
+    sys.path.insert(0, f"{APP_DIR}")
+
+from ollama import ListResponse, StatusResponse  # noqa: E402
+from wollama.wollama import (  # noqa: E402
+    Catalog,
+    CatalogLLM,
+    ModelTag,
+    ModelTagCollection,
+)
+
+TAG_NAMES = ["latest", "1b", "3b", "7b", "8b", "13b", "70b", "instruct-q4_K_M"]
+
+
+def synthetic_catalog(model_count: int, tags_per_model: int = 4) -> Catalog:
+    """
+    Builds a remote catalog with the same shape as one scraped from ollama.com.
+
+    Args:
+        model_count (int): The number of models in the catalog.
+        tags_per_model (int): The number of tags of every model.
+
+    Returns:
+        Catalog
+    """
+    return catalog_from_records(synthetic_records(model_count, tags_per_model))
+
+
+def catalog_from_records(records: list) -> Catalog:
+    """
+    Builds a pydantic Catalog the way the scraper does, from synthetic_records.
+    """
+    catalog = Catalog(name="remote-ollama-catalog")
+    models = {}
+    for name, link, short_description, tags in records:
+        tag_collection = ModelTagCollection()
+        tag_collection.tags = {
+            tag: ModelTag(name=tag, link=tag_link) for tag, tag_link in tags
+        }
+        models[name] = CatalogLLM(
+            name=name,
+            link=link,
+            short_description=short_description,
+            tag_collection=tag_collection,
+        )
+    catalog.models = models
+    return catalog
+
+
+def synthetic_records(model_count: int, tags_per_model: int = 4) -> list:
+    """
+    Returns the records synthetic_catalog is built from, as extracted by the scraper:
+    (name, link, short description, [(tag, tag link), ...]).
+    """
+    records = []
+    for index in range(model_count):
+        name = f"model-{index:05d}"
+        records.append(
+            (
+                name,
+                f"https://ollama.com/library/{name}",
+                f"Synthetic model number {index} for benchmarking the catalog.",
+                [(tag, f"/library/{name}:{tag}") for tag in TAG_NAMES[:tags_per_model]],
+            )
+        )
+    return records
+
+
+def installed_models(catalog: Catalog, every: int = 10) -> list:
+    """
+    Returns "model:tag" strings for every n-th model of the catalog, as if installed.
+    """
+    installed = []
+    for index, model in enumerate(catalog.models.values()):
+        if index % every == 0:
+            tag = next(iter(model.tag_collection.tags))
+            installed.append(f"{model.name}:{tag}")
+    return installed
+
+
+class OfflineClient:
+    """
+    A stand-in for the synchronous ollama Client which never touches the network.
+    """
+
+    def __init__(self, installed: list = None):
+        self.installed = list(installed) if installed else []
+
+    def list(self) -> ListResponse:
+        return ListResponse(
+            models=[ListResponse.Model(model=model) for model in self.installed]
+        )
+
+    def delete(self, model: str) -> StatusResponse:
+        if model in self.installed:
+            self.installed.remove(model)
+        return StatusResponse(status="success")
+
+
+def fixture(name: str) -> str:
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as file:
+        return file.read()
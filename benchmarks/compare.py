@@ -0,0 +1,62 @@
+"""
+Compares two benchmark result files written by benchmarks/bench.py.
+
+Usage:
+    python benchmarks/compare.py results/<old>.json results/<new>.json --threshold 10
+
+Exits with status 1 when any benchmark's median time or retained memory grew by
+more than the threshold (in percent).
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    baseline = load(args.baseline)
+    candidate = load(args.candidate)
+    print(
+        f"baseline:  {baseline['meta']['commit'][:12]}\n"
+        f"candidate: {candidate['meta']['commit'][:12]}\n"
+    )
+
+    regressions = []
+    for key, new in candidate["results"].items():
+        old = baseline["results"].get(key)
+        if old is None:
+            print(f"{key:<40} {'new':>12}")
+            continue
+        if "median_s" in new:
+            metric, scale, unit = "median_s", 1000, "ms"
+        else:
+            metric, scale, unit = "retained_bytes", 1e-6, "MB"
+        if metric not in old or not old[metric]:
+            print(f"{key:<40} {'incomparable':>12}")
+            continue
+        change = (new[metric] - old[metric]) / old[metric] * 100
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        print(
+            f"{key:<40} {old[metric] * scale:10.3f} {unit} -> "
+            f"{new[metric] * scale:10.3f} {unit}  {change:+7.1f}%{flag}"
+        )
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
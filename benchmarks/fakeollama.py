@@ -0,0 +1,426 @@
+"""
+A local stand-in for an Ollama server and the ollama.com library pages.
+
+It implements the parts of the Ollama API used by ollama-admin-ui (list, ps, pull,
+delete, show, blob upload and create) with streaming progress, and serves library
+pages shaped like ollama.com's, with configurable latency, pull throughput and
+error injection. With --models-dir, pulled models are written to a models
+directory laid out like Ollama's, so the fake can be the seed of a fleet.
+
+Usage:
+    python benchmarks/fakeollama.py --port 11435 --models 200 --latency 0.05 --error-rate 0.01
+
+A seed and two fleet nodes:
+    python benchmarks/fakeollama.py --port 11435 --model-size 50000000 --models-dir /tmp/seed
+    python benchmarks/fakeollama.py --port 11436
+    python benchmarks/fakeollama.py --port 11437
+
+Then point the app at it:
+    OLLAMA_ADDRESS=http://127.0.0.1:11435
+    OLLAMA_REGISTRY_URL=http://127.0.0.1:11435/library
+"""
+
+import argparse
+import asyncio
+import hashlib
+import html
+import json
+import random
+import sys
+from pathlib import Path
+
+from aiohttp import web
+from catalogs import TAG_NAMES
+
+
+class FakeOllama:
+    """
+    The state and request handlers of the stand-in server.
+
+    Attributes:
+        models: int: The number of models listed in the library.
+        tags_per_model: int: The number of tags of every model.
+        latency: float: Mean seconds added before every response.
+        jitter: float: Latency is drawn uniformly from latency +/- jitter.
+        throughput: float: Bytes per second at which pulls progress.
+        model_size: int: The size in bytes of every pulled model.
+        error_rate: float: The probability (0-1) that a request fails.
+        installed: dict: "model:tag" -> size of the installed models.
+        models_dir: str: Write pulled models to this directory, None to keep them in memory only.
+        blobs: dict: digest -> size of the blobs uploaded through the blob API.
+        page_kb: int: Pad every library page with about this many KB of markup, as
+            ollama.com's pages are much heavier than the fake's, e.g. to measure parsing.
+    """
+
+    def __init__(
+        self,
+        models: int = 200,
+        tags_per_model: int = 4,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throughput: float = 500_000_000,
+        model_size: int = 2_000_000_000,
+        error_rate: float = 0.0,
+        installed: list = None,
+        seed: int = None,
+        models_dir: str = None,
+        page_kb: int = 0,
+    ):
+        self.models = models
+        self.tags_per_model = tags_per_model
+        self.latency = latency
+        self.jitter = jitter
+        self.throughput = throughput
+        self.model_size = model_size
+        self.error_rate = error_rate
+        self.installed = {model: model_size for model in installed or []}
+        self.random = random.Random(seed)
+        self.models_dir = Path(models_dir) if models_dir else None
+        self.blobs = {}
+        self.padding = "".join(
+            f'<div class="flex px-4 py-2"><span>{index}</span><p>padding</p></div>\n'
+            for index in range(page_kb * 1024 // 64)
+        )
+        self.requests = 0
+        self.errors = 0
+        self.shows = 0
+
+    def model_names(self) -> list:
+        return [f"model-{index:05d}" for index in range(self.models)]
+
+    def tag_names(self) -> list:
+        return TAG_NAMES[: self.tags_per_model]
+
+    @web.middleware
+    async def chaos(self, request: web.Request, handler):
+        self.requests += 1
+        if self.latency or self.jitter:
+            delay = self.random.uniform(
+                max(0.0, self.latency - self.jitter), self.latency + self.jitter
+            )
+            await asyncio.sleep(delay)
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"error": "injected failure"}, status=500)
+        return await handler(request)
+
+    def application(self) -> web.Application:
+        app = web.Application(middlewares=[self.chaos])
+        app.add_routes(
+            [
+                web.get("/api/tags", self.list),
+                web.get("/api/version", self.version),
+                web.get("/api/ps", self.ps),
+                web.post("/api/pull", self.pull),
+                web.delete("/api/delete", self.delete),
+                web.post("/api/show", self.show),
+                web.head("/api/blobs/{digest}", self.has_blob),
+                web.post("/api/blobs/{digest}", self.upload_blob),
+                web.post("/api/create", self.create),
+                web.get("/library", self.library),
+                web.get("/library/{model}", self.library_model),
+            ]
+        )
+        return app
+
+    async def version(self, request: web.Request):
+        return web.json_response({"version": "0.0.0-fake"})
+
+    async def list(self, request: web.Request):
+        models = []
+        for model, size in self.installed.items():
+            models.append(
+                {
+                    "name": model,
+                    "model": model,
+                    "modified_at": "2025-01-01T00:00:00Z",
+                    "size": size,
+                    "digest": hashlib.sha256(model.encode()).hexdigest(),
+                    "details": {
+                        "format": "gguf",
+                        "family": "llama",
+                        "parameter_size": "3.2B",
+                        "quantization_level": "Q4_K_M",
+                    },
+                }
+            )
+        return web.json_response({"models": models})
+
+    async def ps(self, request: web.Request):
+        # The first installed model is loaded, two thirds of it in GPU memory.
+        models = [
+            {
+                "name": model,
+                "model": model,
+                "size": size,
+                "size_vram": size * 2 // 3,
+                "digest": hashlib.sha256(model.encode()).hexdigest(),
+                "expires_at": "2025-01-01T00:05:00Z",
+            }
+            for model, size in list(self.installed.items())[:1]
+        ]
+        return web.json_response({"models": models})
+
+    async def pull(self, request: web.Request):
+        body = await request.json()
+        model = body.get("model") or body.get("name")
+        if ":" not in model:
+            model = f"{model}:latest"
+        digest = f"sha256:{hashlib.sha256(model.encode()).hexdigest()}"
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+
+        async def send(message: dict):
+            await response.write(f"{json.dumps(message)}\n".encode())
+
+        try:
+            await send({"status": "pulling manifest"})
+            completed = 0
+            tick = 0.1
+            while completed < self.model_size:
+                await asyncio.sleep(tick)
+                completed = min(
+                    self.model_size, completed + int(self.throughput * tick)
+                )
+                if self.error_rate and self.random.random() < self.error_rate / 10:
+                    self.errors += 1
+                    await send({"error": "injected failure while pulling"})
+                    await response.write_eof()
+                    return response
+                await send(
+                    {
+                        "status": f"pulling {digest[7:19]}",
+                        "digest": digest,
+                        "total": self.model_size,
+                        "completed": completed,
+                    }
+                )
+            for status in ["verifying sha256 digest", "writing manifest", "success"]:
+                await send({"status": status})
+            if self.models_dir is not None:
+                await asyncio.to_thread(self.write_model, model)
+            self.installed[model] = self.model_size
+            await response.write_eof()
+        except ConnectionResetError:
+            # The client went away mid-pull, e.g. the app was stopped.
+            pass
+        return response
+
+    def _write_blob(self, data_chunks) -> dict:
+        digest = hashlib.sha256()
+        size = 0
+        blobs = self.models_dir / "blobs"
+        blobs.mkdir(parents=True, exist_ok=True)
+        temp = blobs / f"partial-{self.random.getrandbits(64):016x}"
+        with open(temp, "wb") as file:
+            for chunk in data_chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                file.write(chunk)
+        temp.replace(blobs / f"sha256-{digest.hexdigest()}")
+        return {"digest": f"sha256:{digest.hexdigest()}", "size": size}
+
+    def write_model(self, model: str):
+        """
+        Writes a manifest and blobs for model, like a pull by Ollama would.
+        """
+        name, tag = model.split(":")
+        pattern = hashlib.sha256(model.encode()).digest() * 2048
+        remaining = self.model_size
+
+        def weights():
+            nonlocal remaining
+            while remaining > 0:
+                chunk = pattern[:remaining]
+                remaining -= len(chunk)
+                yield chunk
+
+        layer_types = [
+            ("model", weights()),
+            ("template", [b"{{ .System }} {{ .Prompt }}"]),
+            ("params", [json.dumps({"stop": ["<|end|>"]}).encode()]),
+        ]
+        layers = [
+            {"mediaType": f"application/vnd.ollama.image.{kind}", **self._write_blob(data)}
+            for kind, data in layer_types
+        ]
+        config = self._write_blob([json.dumps({"model_format": "gguf"}).encode()])
+        manifest = {
+            "schemaVersion": 2,
+            "mediaType": "application/vnd.docker.distribution.manifest.v2+json",
+            "config": {"mediaType": "application/vnd.docker.container.image.v1+json", **config},
+            "layers": layers,
+        }
+        path = self.models_dir / "manifests" / "registry.ollama.ai" / "library" / name / tag
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(manifest))
+
+    async def has_blob(self, request: web.Request):
+        return web.Response(status=200 if request.match_info["digest"] in self.blobs else 404)
+
+    async def upload_blob(self, request: web.Request):
+        expected = request.match_info["digest"]
+        digest = hashlib.sha256()
+        size = 0
+        async for chunk in request.content.iter_any():
+            digest.update(chunk)
+            size += len(chunk)
+        if f"sha256:{digest.hexdigest()}" != expected:
+            return web.json_response({"error": "digest mismatch"}, status=400)
+        self.blobs[expected] = size
+        return web.Response(status=201)
+
+    async def create(self, request: web.Request):
+        body = await request.json()
+        model = body.get("model") or body.get("name")
+        if ":" not in model:
+            model = f"{model}:latest"
+        digests = [*body.get("files", {}).values(), *body.get("adapters", {}).values()]
+        missing = [digest for digest in digests if digest not in self.blobs]
+        if not digests or missing:
+            return web.json_response(
+                {"error": f"neither 'from' or 'files' was specified or missing blobs {missing}"},
+                status=400,
+            )
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        statuses = ["parsing GGUF"] + [f"using existing layer {digest}" for digest in digests]
+        for status in statuses + ["writing manifest", "success"]:
+            await response.write(f"{json.dumps({'status': status})}\n".encode())
+        self.installed[model] = sum(self.blobs[digest] for digest in digests)
+        await response.write_eof()
+        return response
+
+    async def show(self, request: web.Request):
+        body = await request.json()
+        model = body.get("model") or body.get("name")
+        if ":" not in model:
+            model = f"{model}:latest"
+        if model not in self.installed:
+            return web.json_response({"error": f"model '{model}' not found"}, status=404)
+        self.shows += 1
+        return web.json_response(
+            {
+                "license": "Fake Community License\n\nDo what you like.",
+                "modelfile": f"FROM {model}",
+                "template": "{{ .Prompt }}",
+                "details": {
+                    "format": "gguf",
+                    "family": "llama",
+                    "parameter_size": "3.2B",
+                    "quantization_level": "Q4_K_M",
+                },
+                "model_info": {
+                    "general.architecture": "llama",
+                    "general.parameter_count": 3212749888,
+                    "llama.context_length": 131072,
+                },
+                "capabilities": ["completion", "tools"],
+            }
+        )
+
+    async def delete(self, request: web.Request):
+        body = await request.json()
+        model = body.get("model") or body.get("name")
+        if self.installed.pop(model, None) is None:
+            return web.json_response(
+                {"error": f"model '{model}' not found"}, status=404
+            )
+        return web.Response()
+
+    async def library(self, request: web.Request):
+        rows = "".join(
+            f"""
+      <li x-test-model class="flex items-baseline border-b border-neutral-200 py-6">
+        <a href="/library/{name}" class="group w-full">
+          <h2><span x-test-search-response-title>{name}</span></h2>
+          <p class="max-w-lg break-words text-neutral-800 text-md">{html.escape(f"Fake model {name} served by fakeollama.")}</p>
+          <div class="flex flex-wrap space-x-2">{"".join(f"<span x-test-size>{tag}</span>" for tag in self.tag_names())}</div>
+        </a>
+      </li>"""
+            for name in self.model_names()
+        )
+        return web.Response(
+            content_type="text/html",
+            text=f"""<!DOCTYPE html>
+<html><body>
+<nav><a href="/">Ollama</a> <a href="/search">Models</a></nav>
+<div id="repo"><ul role="list">{rows}
+</ul></div>
+{self.padding}
+</body></html>""",
+            headers={"ETag": f'"library-{len(self.model_names())}"'},
+        )
+
+    async def library_model(self, request: web.Request):
+        name = request.match_info["model"]
+        rows = "".join(
+            f'<div><a href="/library/{name}:{tag}">{name}:{tag}</a><p>2.0GB</p></div>\n'
+            for tag in self.tag_names()
+        )
+        return web.Response(
+            content_type="text/html",
+            text=f"""<!DOCTYPE html>
+<html><body>
+<nav><a href="/">Ollama</a> <a href="/library">library</a></nav>
+<section>{rows}</section>
+<a href="/library/{name}/tags">View all</a>
+{self.padding}
+</body></html>""",
+            headers={"ETag": f'"{name}-{len(self.tag_names())}"'},
+        )
+
+
+async def serve(fake: FakeOllama, host: str, port: int) -> web.AppRunner:
+    runner = web.AppRunner(fake.application(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--models", type=int, default=200)
+    parser.add_argument("--tags-per-model", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--throughput", type=float, default=500_000_000)
+    parser.add_argument("--model-size", type=int, default=2_000_000_000)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--installed", nargs="*", default=[])
+    parser.add_argument("--models-dir", default=None)
+    parser.add_argument("--page-kb", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    fake = FakeOllama(
+        models=args.models,
+        tags_per_model=args.tags_per_model,
+        latency=args.latency,
+        jitter=args.jitter,
+        throughput=args.throughput,
+        model_size=args.model_size,
+        error_rate=args.error_rate,
+        installed=args.installed,
+        models_dir=args.models_dir,
+        page_kb=args.page_kb,
+    )
+
+    async def run():
+        await serve(fake, args.host, args.port)
+        print(f"fakeollama listening on http://{args.host}:{args.port}", flush=True)
+        while True:
+            await asyncio.sleep(3600)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
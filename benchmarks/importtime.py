@@ -0,0 +1,95 @@
+"""
+Checks the import time of the wollama package against a budget.
+
+Imports the module in a fresh interpreter with `python -X importtime`, several
+times, and compares the fastest cumulative import time with the budget. The
+scraping stack (requests, bs4, aiohttp, yarl) is only needed to refresh the
+remote catalog, so importing it eagerly also fails the check.
+
+Usage:
+    python benchmarks/importtime.py --budget-ms 750
+    python benchmarks/importtime.py --module main --budget-ms 1500   # needs Ollama and a warm cache
+
+Exits with status 1 when the import took longer than the budget or imported a
+forbidden module.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+LAZY_MODULES = ["bs4", "requests", "aiohttp", "yarl"]
+
+
+def measure(module: str) -> list:
+    """
+    Imports module in a fresh interpreter, returns [(level, self_us, cumulative_us, name)].
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Could not import {module}:\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        level = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((level, int(self_us), int(cumulative_us), name.strip()))
+    return entries
+
+
+def direct_imports(entries: list, module: str) -> list:
+    """
+    Returns the entries imported directly by module, slowest first.
+    """
+    children = []
+    for level, self_us, cumulative_us, name in entries:
+        if level == 0:
+            if name == module:
+                break
+            children = []
+        elif level == 1:
+            children.append((cumulative_us, name))
+    return sorted(children, reverse=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="wollama.wollama")
+    parser.add_argument("--budget-ms", type=float, default=750.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--forbid", nargs="*", default=LAZY_MODULES)
+    args = parser.parse_args(argv)
+
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    totals = [
+        next(cumulative for level, _, cumulative, name in run if name == args.module)
+        for run in runs
+    ]
+    fastest = runs[totals.index(min(totals))]
+    print(f"{args.module}: {min(totals) / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)\n")
+    for cumulative_us, name in direct_imports(fastest, args.module)[: args.top]:
+        print(f"  {name:<40} {cumulative_us / 1000:10.1f} ms")
+
+    failures = []
+    if min(totals) / 1000 > args.budget_ms:
+        failures.append(f"{args.module} took {min(totals) / 1000:.1f} ms")
+    imported = {name.split(".")[0] for _, _, _, name in fastest}
+    for name in args.forbid:
+        if name in imported:
+            failures.append(f"{name} is imported eagerly")
+    for failure in failures:
+        print(f"\nOVER BUDGET: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+End-to-end load test of ollama-admin-ui against a local fake Ollama and registry.
+
+Starts benchmarks/fakeollama.py in-process, starts the app with uvicorn pointed
+at it, then drives many concurrent UI clients (page loads, status polls,
+downloads) and reports latency percentiles and the app's event loop lag.
+
+Usage:
+    python benchmarks/loadtest.py --clients 50 --duration 30 --latency 0.05 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+from catalogs import APP_DIR
+from fakeollama import FakeOllama, serve
+from wollama.profiling import percentile
+
+STATUS_URL = re.compile(r'hx-get="(/status/[^"]+)"')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Stats:
+    """
+    Latencies in seconds and error counts, per kind of request.
+    """
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, kind: str, latency: float, ok: bool):
+        self.latencies.setdefault(kind, []).append(latency)
+        if not ok:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def summary(self, duration: float) -> dict:
+        summary = {}
+        for kind, latencies in sorted(self.latencies.items()):
+            summary[kind] = {
+                "requests": len(latencies),
+                "errors": self.errors.get(kind, 0),
+                "rps": len(latencies) / duration,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "max_ms": max(latencies) * 1000,
+            }
+        return summary
+
+
+async def timed(
+    session, stats: Stats, kind: str, method: str, url: str, first_byte: bool = False
+) -> str:
+    """
+    Requests url and records its latency, and the time to its first byte as
+    "<kind>_ttfb" if first_byte.
+    """
+    start = time.perf_counter()
+    try:
+        async with session.request(method, url) as response:
+            ok = response.status < 500
+            if first_byte:
+                first = await response.content.readany()
+                stats.record(f"{kind}_ttfb", time.perf_counter() - start, ok)
+                text = (first + await response.content.read()).decode("utf-8", "replace")
+            else:
+                text = await response.text()
+            stats.record(kind, time.perf_counter() - start, ok)
+            return text
+    except Exception:
+        stats.record(kind, time.perf_counter() - start, False)
+        return ""
+
+
+async def ui_client(session, args, stats: Stats, jobs: list, deadline: float, seed):
+    rnd = random.Random(seed)
+    total = args.page_weight + args.poll_weight + args.download_weight
+    while time.monotonic() < deadline:
+        choice = rnd.uniform(0, total)
+        if choice < args.page_weight:
+            await timed(session, stats, "page", "GET", "/", first_byte=True)
+        elif choice < args.page_weight + args.download_weight:
+            model = f"model-{rnd.randrange(args.models):05d}"
+            text = await timed(
+                session,
+                stats,
+                "download",
+                "PUT",
+                f"/draft/download/{model}?tag=latest",
+            )
+            match = STATUS_URL.search(text)
+            if match:
+                jobs.append(match.group(1))
+        elif jobs:
+            url = rnd.choice(jobs)
+            text = await timed(session, stats, "poll", "GET", url)
+            if "Finished" in text and url in jobs:
+                jobs.remove(url)
+        await asyncio.sleep(rnd.uniform(0, 2 * args.think_time))
+
+
+async def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError("The app exited before it was ready.")
+            try:
+                async with session.get(f"{base_url}/favicon.ico") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError("The app did not become ready in time.")
+
+
+async def run(args) -> dict:
+    fake = FakeOllama(
+        models=args.models,
+        latency=args.latency,
+        jitter=args.jitter,
+        throughput=args.throughput,
+        model_size=args.model_size,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        page_kb=args.page_kb,
+    )
+    fake_port = free_port()
+    runner = await serve(fake, "127.0.0.1", fake_port)
+
+    # Keep the checked-in catalog cache untouched by refreshes.
+    cache_dir = tempfile.mkdtemp(prefix="wollama-loadtest-")
+    for filename in os.listdir(APP_DIR / "wollama" / "cache"):
+        shutil.copy(APP_DIR / "wollama" / "cache" / filename, cache_dir)
+
+    app_port = free_port()
+    base_url = f"http://127.0.0.1:{app_port}"
+    env = dict(
+        os.environ,
+        OLLAMA_ADDRESS=f"http://127.0.0.1:{fake_port}",
+        OLLAMA_REGISTRY_URL=f"http://127.0.0.1:{fake_port}/library",
+        OLLAMA_REGISTRY_DELAY=f"{args.registry_delay}",
+        WOLLAMA_CACHE_DIR=cache_dir,
+        LOG_LEVEL=args.log_level,
+        PARSE_WORKERS=args.parse_workers,
+        STREAM_LIBRARY="TRUE" if args.stream_library else "FALSE",
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            f"{app_port}",
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        cwd=APP_DIR,
+        env=env,
+    )
+    try:
+        await wait_until_ready(base_url, process, timeout=60)
+        connector = aiohttp.TCPConnector(limit=args.clients)
+        async with aiohttp.ClientSession(
+            base_url=base_url, connector=connector
+        ) as session:
+            stats = Stats()
+            started = time.time()
+            if args.refresh:
+                await timed(session, stats, "refresh", "POST", "/refresh-library")
+            jobs = []
+            deadline = time.monotonic() + args.duration
+            await asyncio.gather(
+                *[
+                    ui_client(session, args, stats, jobs, deadline, args.seed + index)
+                    for index in range(args.clients)
+                ]
+            )
+            duration = time.time() - started
+            async with session.get(
+                "/admin/loop-lag", params={"seconds": f"{duration}"}
+            ) as response:
+                loop_lag = await response.json()
+        return {
+            "config": vars(args),
+            "duration_s": duration,
+            "requests": stats.summary(duration),
+            "loop_lag": loop_lag,
+            "fake_ollama": {"requests": fake.requests, "errors": fake.errors},
+        }
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        await runner.cleanup()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--think-time", type=float, default=0.5)
+    parser.add_argument("--page-weight", type=float, default=0.3)
+    parser.add_argument("--poll-weight", type=float, default=0.6)
+    parser.add_argument("--download-weight", type=float, default=0.1)
+    parser.add_argument("--refresh", action="store_true", help="Refresh the registry once.")
+    parser.add_argument("--models", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--throughput", type=float, default=100_000_000)
+    parser.add_argument("--model-size", type=int, default=200_000_000)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--registry-delay", type=float, default=0.0)
+    parser.add_argument("--page-kb", type=int, default=0, help="Pad library pages.")
+    parser.add_argument("--parse-workers", choices=["inline", "thread", "process"], default="inline")
+    parser.add_argument(
+        "--stream-library", action="store_true", help="Stream the library page in chunks."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", default=None, help="Write the report as JSON.")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+
+    print(f"{'kind':<10}{'requests':>10}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for kind, row in report["requests"].items():
+        print(
+            f"{kind:<10}{row['requests']:>10}{row['errors']:>8}{row['rps']:>9.1f}"
+            f"{row['p50_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['max_ms']:>10.1f}"
+        )
+    lag = report["loop_lag"]
+    print(
+        f"event loop lag: p50 {lag['p50_ms']:.1f} ms, p99 {lag['p99_ms']:.1f} ms,"
+        f" max {lag['max_ms']:.1f} ms ({lag['count']} samples)"
+    )
+    fake = report["fake_ollama"]
+    print(f"fake ollama: {fake['requests']} requests, {fake['errors']} injected errors")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Re-records the ollama.com HTML fixtures used by the benchmark suite.
+
+This is the only part of the benchmark suite which needs network access.
+
+Usage:
+    python benchmarks/record_fixtures.py llama3.2
+"""
+
+import argparse
+import sys
+
+import requests
+from catalogs import FIXTURE_DIR
+
+LIBRARY_URL = "https://ollama.com/library"
+
+
+def record(url: str, filename: str):
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    with open(FIXTURE_DIR / filename, "w", encoding="utf-8") as file:
+        file.write(response.content.decode("utf-8"))
+    print(f"Recorded {url} -> {filename}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("models", nargs="*", default=["llama3.2"])
+    args = parser.parse_args(argv)
+
+    record(LIBRARY_URL, "library.html")
+    for model in args.models:
+        record(f"{LIBRARY_URL}/{model}", f"library-{model}.html")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())